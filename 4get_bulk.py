@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+# Library lives next to the engines; SearXNG itself must be importable (searx.exceptions etc.)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "searx", "engines"))
+
+# --- Helpers ---
+
+def parse_rates(values):
+    rates = {}
+    for value in values or []:
+        engine, _, rate = value.partition("=")
+        rates[engine.strip()] = float(rate)
+    return rates
+
+def read_queries(path):
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with stream:
+        for line in stream:
+            query = line.strip()
+            if query:
+                yield query
+
+async def run(args):
+    from fourget_async_client import AsyncFourgetClient
+    from fourget_batch import jsonable
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    jobs = asyncio.Queue(maxsize=args.concurrency * 4)
+    done = {"ok": 0, "error": 0}
+
+    async def worker(client):
+        while True:
+            job = await jobs.get()
+            if job is None:
+                jobs.task_done()
+                return
+            query, engine, pageno = job
+            record = {"query": query, "engine": engine, "category": args.category, "pageno": pageno}
+            try:
+                record["results"] = await client.search(engine, query, category=args.category, pageno=pageno,
+                                                        language=args.language)
+                done["ok"] += 1
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                done["error"] += 1
+            out.write(json.dumps(record, default=jsonable, ensure_ascii=False) + "\n")
+            out.flush()
+            jobs.task_done()
+
+    async with AsyncFourgetClient(concurrency=args.concurrency, rate_limits=parse_rates(args.rate_for),
+                                  default_rate=args.rate, retries=args.retries, timeout=args.timeout,
+                                  priority=args.priority) as client:
+        workers = [asyncio.create_task(worker(client)) for _ in range(args.concurrency)]
+        for query in read_queries(args.queries):
+            for engine in args.engine:
+                for pageno in range(1, args.pages + 1):
+                    await jobs.put((query, engine, pageno))
+        for _ in workers:
+            await jobs.put(None)
+        await asyncio.gather(*workers)
+
+    if out is not sys.stdout:
+        out.close()
+    print(f"Done: {done['ok']} ok, {done['error']} failed", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a query file through the 4get sidecar and stream normalized results as JSONL.")
+    parser.add_argument("queries", help="file with one query per line, or - for stdin")
+    parser.add_argument("-e", "--engine", action="append", required=True, help="4get engine id (repeatable), e.g. google")
+    parser.add_argument("-c", "--category", default="general", help="SearXNG category: general, images, videos, news, music")
+    parser.add_argument("-p", "--pages", type=int, default=1, help="pages per query")
+    parser.add_argument("-l", "--language", default=None, help="SearXNG language, e.g. en-US")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (appended), - for stdout")
+    parser.add_argument("--sidecar", default=None, help="sidecar base URL(s), overrides FOURGET_SIDECARS")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=2.0, help="default requests/second per engine (0 = unlimited)")
+    parser.add_argument("--rate-for", action="append", metavar="ENGINE=RPS", help="per-engine rate limit")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--priority", choices=["bulk", "interactive"], default="bulk", help="sidecar priority lane")
+    args = parser.parse_args()
+
+    if args.sidecar:
+        os.environ["FOURGET_SIDECARS"] = args.sidecar
+
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import re
+import sys
+import json
+import argparse
+import urllib.request
+
+DEFAULT_SIDECAR = "http://localhost:8081"
+ENTRY_NAME_RE = re.compile(r'^\s*-\s*name:\s*(\S+)', re.M)
+SHORTCUT_RE = re.compile(r'^\s*shortcut:\s*(\S+)', re.M)
+
+# --- Helpers ---
+
+def fetch_spec(sidecar):
+    with urllib.request.urlopen(f"{sidecar.rstrip('/')}/engines.php", timeout=10) as resp:
+        spec = json.loads(resp.read())
+    if not isinstance(spec, dict) or not spec:
+        raise SystemExit("Sidecar returned no engine spec (manifest missing?)")
+    return spec
+
+def pick_shortcut(engine_id, taken):
+    base = re.sub(r'[^a-z]', '', engine_id)[:2] or "x"
+    candidate = f"{base}4g"
+    n = 2
+    while candidate in taken:
+        candidate = f"{base}{n}4g"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+def format_entry(engine_id, spec, shortcut, timeout, disabled):
+    lines = [
+        f"  - name: {engine_id.replace('-', '_')}4",
+        "    engine: fourget",
+        f"    fourget_engine: {engine_id}",
+        "    enable_http: true",
+        f"    shortcut: {shortcut}",
+        f"    categories: [{', '.join(spec['categories'] or ['general'])}]",
+        f"    paging: {'true' if spec['paging'] else 'false'}",
+        f"    time_range_support: {'true' if spec['time_range'] else 'false'}",
+        f"    timeout: {timeout}",
+        f"    disabled: {'true' if disabled else 'false'}",
+    ]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate settings.yml engine entries for every 4get scraper the sidecar knows.")
+    parser.add_argument("--sidecar", default=DEFAULT_SIDECAR, help="sidecar base URL")
+    parser.add_argument("--existing", default=None,
+                        help="settings file whose engines/shortcuts are skipped (e.g. settings-additions.yml), to list only new scrapers")
+    parser.add_argument("--only", default=None, help="comma separated engine ids")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--enable", action="store_true", help="emit entries enabled (default: disabled: true)")
+    args = parser.parse_args()
+
+    spec = fetch_spec(args.sidecar)
+    existing_names, taken = set(), set()
+    if args.existing:
+        with open(args.existing, "r", encoding="utf-8") as f:
+            text = f.read()
+        existing_names = set(ENTRY_NAME_RE.findall(text))
+        taken = set(SHORTCUT_RE.findall(text))
+
+    only = {e.strip().replace('_', '-') for e in args.only.split(",")} if args.only else None
+    entries = []
+    for manifest_id in sorted(spec):
+        engine_id = manifest_id.replace('_', '-')
+        if only and engine_id not in only:
+            continue
+        if f"{engine_id.replace('-', '_')}4" in existing_names:
+            continue
+        entries.append(format_entry(engine_id, spec[manifest_id], pick_shortcut(engine_id, taken), args.timeout, not args.enable))
+
+    if not entries:
+        print("No new engines.", file=sys.stderr)
+        return
+    print("engines:\n" + "\n\n".join(entries))
+
+if __name__ == "__main__":
+    main()
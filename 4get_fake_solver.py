@@ -0,0 +1,77 @@
+import sys
+import json
+import time
+import argparse
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# --- Helpers ---
+
+def make_handler(args):
+    cookies = []
+    for pair in args.cookie or ["cf_clearance=fake-clearance"]:
+        name, _, value = pair.partition("=")
+        cookies.append((name, value))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+            try:
+                request = json.loads(body)
+            except ValueError:
+                request = {}
+            print(f"solve {request.get('cmd')} {request.get('url')} proxy={request.get('proxy')}", file=sys.stderr)
+
+            if args.delay:
+                time.sleep(args.delay)
+
+            if args.fail:
+                reply = {"status": "error", "message": "Error solving the challenge. Timeout after 60.0 seconds."}
+            else:
+                host = urlparse(request.get("url") or "").hostname or ""
+                expires = int(time.time()) + args.ttl
+                reply = {
+                    "status": "ok",
+                    "message": "Challenge solved!",
+                    "solution": {
+                        "url": request.get("url"),
+                        "status": 200,
+                        "cookies": [
+                            {"name": n, "value": v, "domain": f".{host}", "path": "/", "expires": expires}
+                            for n, v in cookies
+                        ],
+                        "userAgent": args.ua,
+                        "response": "<html></html>",
+                    },
+                }
+
+            data = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *_):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in for FlareSolverr's /v1 API, to test the sidecar's challenge solving locally.")
+    parser.add_argument("--port", type=int, default=8191)
+    parser.add_argument("--cookie", action="append", metavar="NAME=VALUE", help="cookie to hand out (repeatable)")
+    parser.add_argument("--ua", default=DEFAULT_UA, help="user agent to hand out")
+    parser.add_argument("--ttl", type=int, default=1800, help="cookie lifetime in seconds")
+    parser.add_argument("--delay", type=float, default=0, help="seconds to 'solve'")
+    parser.add_argument("--fail", action="store_true", help="always reply with a solve error")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), make_handler(args))
+    print(f"Fake solver on :{args.port}/v1", file=sys.stderr)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
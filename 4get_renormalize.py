@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+import argparse
+
+# Needs SearXNG importable (run inside the searxng container or a checkout on PYTHONPATH)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "searx", "engines"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-normalize an archive of raw sidecar JSON responses (one per line) into JSONL results.")
+    parser.add_argument("archive", help="JSONL file of raw harness.php responses")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output, - for stdout")
+    parser.add_argument("--field", default=None, help="read the raw response from this key of each line (e.g. raw for shadow logs)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--chunksize", type=int, default=64, help="documents per IPC chunk")
+    args = parser.parse_args()
+
+    from fourget_batch import normalize_many, jsonable
+
+    def progress(done, rate):
+        print(f"{done} docs, {rate:.0f} docs/s", file=sys.stderr)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    errors = 0
+    for results, error in normalize_many(args.archive, workers=args.workers, chunksize=args.chunksize,
+                                         field=args.field, progress=progress):
+        errors += error is not None
+        out.write(json.dumps({"results": results, "error": error}, default=jsonable, ensure_ascii=False) + "\n")
+    if out is not sys.stdout:
+        out.close()
+    print(f"Done: {errors} documents failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import re
+import sys
+import math
+import json
+import argparse
+from collections import defaultdict
+
+DEFAULT_LOG = "/tmp/4get-shadow.jsonl"
+URL_NORMALIZE_RE = re.compile(r'^https?://(www\.)?')
+
+# --- Helpers ---
+
+def normalize_url(url):
+    url = URL_NORMALIZE_RE.sub('', url.split('#', 1)[0])
+    return url.rstrip('/').lower()
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+def load_samples(path):
+    """Group shadow records by shadow id -> {side: record}. Unpaired ids are kept and counted."""
+    samples = defaultdict(dict)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            samples[record['id']][record['side']] = record
+    return samples
+
+def renormalize(samples, workers=None):
+    """Recompute the 4get side from stored raw sidecar JSON with the current normalization code.
+
+    Needs SearXNG importable (run inside the searxng container or a checkout on PYTHONPATH).
+    """
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "searx", "engines"))
+    from fourget_batch import normalize_many
+    from fourget_shadow import ShadowRecorder
+
+    records = [sides['4get'] for sides in samples.values() if 'raw' in sides.get('4get', {})]
+    outputs = normalize_many((record['raw'] for record in records), workers=workers)
+    for record, (results, error) in zip(records, outputs):
+        urls = ShadowRecorder.result_urls(results)
+        record.update(count=len(urls), urls=urls, error=error)
+
+def summarize(samples):
+    pairs = defaultdict(lambda: {
+        'samples': 0, 'unpaired': 0,
+        '4get': {'latency': [], 'count': [], 'errors': 0},
+        'native': {'latency': [], 'count': [], 'errors': 0},
+        'jaccard': [], 'native_coverage': [],
+    })
+
+    for sides in samples.values():
+        any_side = next(iter(sides.values()))
+        stats = pairs[any_side['pair']]
+        if '4get' not in sides or 'native' not in sides:
+            stats['unpaired'] += 1
+            continue
+
+        stats['samples'] += 1
+        for side in ('4get', 'native'):
+            record = sides[side]
+            stats[side]['latency'].append(record['latency'])
+            stats[side]['count'].append(record['count'])
+            if record.get('error'):
+                stats[side]['errors'] += 1
+
+        fourget_urls = {normalize_url(u) for u in sides['4get']['urls']}
+        native_urls = {normalize_url(u) for u in sides['native']['urls']}
+        union = fourget_urls | native_urls
+        if union:
+            stats['jaccard'].append(len(fourget_urls & native_urls) / len(union))
+        if native_urls:
+            stats['native_coverage'].append(len(fourget_urls & native_urls) / len(native_urls))
+
+    report = {}
+    for pair, stats in sorted(pairs.items()):
+        n = stats['samples']
+        entry = {'samples': n, 'unpaired': stats['unpaired']}
+        for side in ('4get', 'native'):
+            s = stats[side]
+            entry[side] = {
+                'p50_latency': percentile(s['latency'], 50),
+                'p90_latency': percentile(s['latency'], 90),
+                'p99_latency': percentile(s['latency'], 99),
+                'mean_results': round(sum(s['count']) / n, 2) if n else None,
+                'error_rate': round(s['errors'] / n, 3) if n else None,
+            }
+        entry['mean_jaccard'] = round(sum(stats['jaccard']) / len(stats['jaccard']), 3) if stats['jaccard'] else None
+        entry['mean_native_coverage'] = (
+            round(sum(stats['native_coverage']) / len(stats['native_coverage']), 3) if stats['native_coverage'] else None
+        )
+        report[pair] = entry
+    return report
+
+def format_report(report):
+    lines = []
+    for pair, entry in report.items():
+        lines.append(f"{pair}  ({entry['samples']} paired, {entry['unpaired']} unpaired)")
+        for side in ('4get', 'native'):
+            s = entry[side]
+            lines.append(
+                f"  {side:<7} p50 {s['p50_latency']}s  p90 {s['p90_latency']}s  p99 {s['p99_latency']}s  "
+                f"results {s['mean_results']}  errors {s['error_rate']}"
+            )
+        lines.append(f"  overlap  jaccard {entry['mean_jaccard']}  native coverage {entry['mean_native_coverage']}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare 4get engines against native SearXNG engines from a shadow log.")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG, help="shadow JSONL (FOURGET_SHADOW_LOG) or a saved fixture")
+    parser.add_argument("--json", action="store_true", help="emit the report as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="processes for --renormalize (default: CPU count)")
+    parser.add_argument("--renormalize", action="store_true",
+                        help="re-run current normalization on stored raw responses (needs FOURGET_SHADOW_RAW=1 logs)")
+    args = parser.parse_args()
+
+    samples = load_samples(args.log)
+    if args.renormalize:
+        renormalize(samples, args.workers)
+
+    report = summarize(samples)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
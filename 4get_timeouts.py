@@ -0,0 +1,302 @@
+import re
+import sys
+import json
+import math
+import argparse
+import urllib.request
+from collections import defaultdict
+
+DEFAULT_SETTINGS = "settings-additions.yml"
+DEFAULT_SHADOW_LOG = "/tmp/4get-shadow.jsonl"
+ENTRY_SPLIT_RE = re.compile(r'^(?=[ \t]*-[ \t]*name:)', re.M)
+FOURGET_ENGINE_RE = re.compile(r'^([ \t]*)fourget_engine:[ \t]*(\S+).*$', re.M)
+TIMEOUT_RE = re.compile(r'^([ \t]*timeout:[ \t]*)(\S+)', re.M)
+METRIC_RE = re.compile(r'^(\w+)\{([^}]*)\}\s+(\S+)$')
+LABEL_RE = re.compile(r'(\w+)="([^"]*)"')
+
+HOP_OVERHEAD = 0.15  # client-side time the sidecar histogram doesn't see (FourgetHijackerClient.DEADLINE_MARGIN)
+AT_LIMIT = 0.9  # latency within this share of the current timeout counts as cut off by it
+# Harness outcomes that ran the scraper; window/harvest hits, token misses and overload rejections return in microseconds
+SCRAPED_OUTCOMES = ('ok', 'empty', 'exception', 'challenge')
+TIMEOUT_ERROR = 'timeout'  # ShadowRecorder.TIMEOUT_ERROR: SearXNG gave up on the 4get side
+
+# --- Helpers ---
+
+def engine_key(engine_id):
+    return engine_id.replace('-', '_')
+
+def read_settings(path):
+    """fourget_engine -> current timeout (None when the entry has none), in file order."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    current = {}
+    for entry in ENTRY_SPLIT_RE.split(text):
+        engine = FOURGET_ENGINE_RE.search(entry)
+        if engine:
+            timeout = TIMEOUT_RE.search(entry)
+            current[engine.group(2)] = float(timeout.group(2)) if timeout else None
+    return text, current
+
+def load_shadow(paths):
+    """engine -> [(latency, results, error)] from the 4get side of shadow logs (client round trip).
+
+    error is the record's error string or None; TIMEOUT_ERROR marks requests SearXNG timed out.
+    """
+    samples = defaultdict(list)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('side') != '4get':
+                    continue
+                engine = record['pair'].split(':', 1)[0]
+                samples[engine_key(engine)].append((record['latency'], record['count'], record.get('error') or None))
+    return samples
+
+def load_metrics(source):
+    """engine -> {'buckets': [(le, cumulative)], 'requests', 'results'} from the sidecar's /metrics text."""
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=10) as resp:
+            text = resp.read().decode()
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
+
+    buckets = defaultdict(lambda: defaultdict(float))
+    totals = defaultdict(lambda: {'requests': 0.0, 'results': 0.0, 'errors': 0.0})
+    for line in text.splitlines():
+        m = METRIC_RE.match(line.strip())
+        if not m:
+            continue
+        name, labels, value = m.group(1), dict(LABEL_RE.findall(m.group(2))), float(m.group(3))
+        engine = labels.get('engine')
+        if engine is None:
+            continue
+        if name == 'fourget_scrape_duration_seconds_bucket':
+            # Client traffic only: canary probes and warmer refills aren't bound by the engine timeout
+            if labels.get('outcome', 'ok') not in SCRAPED_OUTCOMES or labels.get('caller', 'search') != 'search':
+                continue
+            buckets[engine][math.inf if labels['le'] == '+Inf' else float(labels['le'])] += value
+        elif name == 'fourget_requests_total':
+            totals[engine]['requests'] += value
+            if labels.get('outcome') in ('exception', 'error', 'overloaded', 'challenge'):
+                totals[engine]['errors'] += value
+        elif name == 'fourget_results_total':
+            totals[engine]['results'] += value
+
+    return {
+        engine: {'buckets': sorted(bounds.items()), **totals[engine]}
+        for engine, bounds in buckets.items()
+    }
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+def histogram_share(buckets, seconds):
+    """Share of requests done within `seconds`, linear within a bucket."""
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return 0.0
+    lower, below = 0.0, 0.0
+    for le, cumulative in buckets:
+        if seconds < le:
+            if math.isinf(le):
+                return below / total
+            return (below + (cumulative - below) * (seconds - lower) / (le - lower)) / total
+        lower, below = le, cumulative
+    return 1.0
+
+def histogram_quantile(buckets, q):
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    lower, below = 0.0, 0.0
+    for le, cumulative in buckets:
+        if cumulative >= q * total:
+            if math.isinf(le):
+                return lower
+            return lower + (le - lower) * (q * total - below) / max(cumulative - below, 1e-9)
+        lower, below = le, cumulative
+    return lower
+
+def grid(low, high, step):
+    steps = int(round((high - low) / step))
+    return [round(low + i * step, 2) for i in range(steps + 1)]
+
+def tune_from_samples(samples, current):
+    ok = [(latency, count) for latency, count, error in samples if not error]
+    timed_out = sum(1 for _, _, error in samples if error == TIMEOUT_ERROR)
+    total_results = sum(count for _, count in ok)
+    latencies = [latency for latency, _ in ok]
+    # Timed-out requests ran into the current timeout: never covered, always at the limit
+    answered = len(latencies) + timed_out
+
+    def coverage(timeout):
+        if not total_results:
+            return len([l for l in latencies if l <= timeout]) / answered if answered else 0.0
+        return sum(count for latency, count in ok if latency <= timeout) / total_results
+
+    cut_off = sum(1 for l in latencies if current and l >= current * AT_LIMIT) + (timed_out if current else 0)
+    at_limit = cut_off / answered if answered else 0.0
+    return {
+        'source': 'shadow',
+        'samples': len(samples),
+        'error_rate': round(1 - len(ok) / len(samples), 3) if samples else None,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'at_limit': round(at_limit, 3),
+        'coverage': coverage,
+    }
+
+def tune_from_histogram(metrics, current):
+    buckets = metrics['buckets']
+    requests = buckets[-1][1] if buckets else 0
+    quantile = lambda q: round(histogram_quantile(buckets, q) + HOP_OVERHEAD, 3) if requests else None
+    sidecar_limit = (current - HOP_OVERHEAD) * AT_LIMIT if current else None
+    return {
+        'source': 'metrics',
+        'samples': int(requests),
+        'error_rate': round(metrics['errors'] / metrics['requests'], 3) if metrics['requests'] else None,
+        'p50': quantile(0.5),
+        'p95': quantile(0.95),
+        'p99': quantile(0.99),
+        'at_limit': round(1 - histogram_share(buckets, sidecar_limit), 3) if sidecar_limit else 0.0,
+        # yield per request isn't broken down by latency here: coverage = share of requests done in time
+        'coverage': lambda timeout: histogram_share(buckets, timeout - HOP_OVERHEAD),
+    }
+
+def recommend(stats, current, args):
+    """Smallest timeout reaching the coverage target, within [--min, --tail]; cut-off data never lowers."""
+    if stats['samples'] < args.min_samples:
+        return current, f"only {stats['samples']} samples"
+
+    recommended = None
+    for timeout in grid(args.min, args.tail, args.step):
+        if stats['coverage'](timeout) >= args.coverage:
+            recommended = timeout
+            break
+    note = ""
+    if recommended is None:
+        recommended, note = args.tail, f"coverage target not reached by the {args.tail}s tail budget"
+
+    if current and stats['at_limit'] > args.max_at_limit:
+        # The current timeout cut these requests short, so the data can't show what a longer one would get
+        raised = min(args.tail, round(current * 1.25 / args.step) * args.step)
+        if recommended < raised:
+            recommended, note = raised, f"{stats['at_limit']:.0%} of requests ran into the current timeout"
+    return round(recommended, 2), note
+
+def format_report(rows):
+    lines = [f"{'engine':<16} {'src':<8} {'n':>6} {'err':>6} {'p50':>6} {'p95':>6} {'p99':>6} {'limit%':>6} "
+             f"{'now':>5} {'cov':>5} {'new':>5} {'cov':>5}  note"]
+    fmt = lambda v, spec: format(v, spec) if v is not None else '-'
+    for engine, row in rows.items():
+        s = row['stats']
+        lines.append(
+            f"{engine:<16} {s['source']:<8} {s['samples']:>6} {fmt(s['error_rate'], '>6.3f')} "
+            f"{fmt(s['p50'], '>6.2f')} {fmt(s['p95'], '>6.2f')} {fmt(s['p99'], '>6.2f')} {s['at_limit']:>6.1%} "
+            f"{fmt(row['current'], '>5.1f')} {fmt(row['current_coverage'], '>5.2f')} "
+            f"{fmt(row['recommended'], '>5.2f')} {fmt(row['coverage'], '>5.2f')}  {row['note']}"
+        )
+    return "\n".join(lines)
+
+def updated_settings(text, recommended):
+    """settings text with each fourget entry's timeout replaced (or added) with the recommendation."""
+    entries = ENTRY_SPLIT_RE.split(text)
+    for i, entry in enumerate(entries):
+        engine = FOURGET_ENGINE_RE.search(entry)
+        if not engine or engine.group(2) not in recommended:
+            continue
+        value = recommended[engine.group(2)]
+        if TIMEOUT_RE.search(entry):
+            entries[i] = TIMEOUT_RE.sub(lambda m: f"{m.group(1)}{value}", entry, count=1)
+        else:
+            entries[i] = FOURGET_ENGINE_RE.sub(lambda m: f"{m.group(0)}\n{m.group(1)}timeout: {value}", entry, count=1)
+    return "".join(entries)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recommend per-engine 4get timeouts from recorded latency and yield "
+                    "(shadow logs and/or the sidecar's /metrics).")
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS, help="settings file holding the fourget entries")
+    parser.add_argument("--shadow", action="append", default=None,
+                        help=f"shadow JSONL with per-request latency/results (repeatable, default {DEFAULT_SHADOW_LOG} if present)")
+    parser.add_argument("--metrics", default=None, help="sidecar /metrics URL or saved file (all engines, bucketed)")
+    parser.add_argument("--coverage", type=float, default=0.95, help="share of results a timeout must keep")
+    parser.add_argument("--tail", type=float, default=5.0, help="tail latency budget: no engine gets more than this")
+    parser.add_argument("--min", type=float, default=1.0, help="lowest timeout to recommend")
+    parser.add_argument("--step", type=float, default=0.25)
+    parser.add_argument("--min-samples", type=int, default=30, help="keep the current timeout with fewer samples")
+    parser.add_argument("--max-at-limit", type=float, default=0.05,
+                        help="share of requests at the current timeout above which it is never lowered")
+    parser.add_argument("--json", action="store_true", help="emit the report as JSON")
+    parser.add_argument("--write", default=None, help="write the updated settings to this path (default: print)")
+    parser.add_argument("--apply", default=None, metavar="PATH",
+                        help="write engine -> timeout JSON for the client to pick up at runtime (FOURGET_TIMEOUTS_FILE)")
+    args = parser.parse_args()
+
+    text, current = read_settings(args.settings)
+    shadow_paths = args.shadow
+    if shadow_paths is None:
+        try:
+            open(DEFAULT_SHADOW_LOG).close()
+            shadow_paths = [DEFAULT_SHADOW_LOG]
+        except OSError:
+            shadow_paths = []
+    shadow = load_shadow(shadow_paths)
+    metrics = load_metrics(args.metrics) if args.metrics else {}
+    if not shadow and not metrics:
+        raise SystemExit("No latency data: pass --shadow and/or --metrics")
+
+    rows = {}
+    for engine, timeout in current.items():
+        key = engine_key(engine)
+        # Shadow samples are per request with yield; prefer them when there are enough
+        if len(shadow.get(key, [])) >= args.min_samples or (key in shadow and key not in metrics):
+            stats = tune_from_samples(shadow[key], timeout)
+            if key in metrics:
+                # Shadow logs from before timeout records miss the cut-off requests; the histogram sees them
+                stats['at_limit'] = max(stats['at_limit'], tune_from_histogram(metrics[key], timeout)['at_limit'])
+        elif key in metrics:
+            stats = tune_from_histogram(metrics[key], timeout)
+        else:
+            continue
+        recommended, note = recommend(stats, timeout, args)
+        rows[engine] = {
+            'stats': stats,
+            'current': timeout,
+            'current_coverage': round(stats['coverage'](timeout), 3) if timeout else None,
+            'recommended': recommended,
+            'coverage': round(stats['coverage'](recommended), 3) if recommended else None,
+            'note': note,
+        }
+
+    if args.json:
+        report = {e: {**{k: v for k, v in r['stats'].items() if k != 'coverage'},
+                      **{k: v for k, v in r.items() if k != 'stats'}} for e, r in rows.items()}
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(rows), file=sys.stderr)
+
+    recommended = {engine: row['recommended'] for engine, row in rows.items() if row['recommended'] is not None}
+    settings = updated_settings(text, recommended)
+    if args.write:
+        with open(args.write, "w", encoding="utf-8") as f:
+            f.write(settings)
+    elif not args.json:
+        print(settings)
+
+    if args.apply:
+        with open(args.apply, "w", encoding="utf-8") as f:
+            json.dump(recommended, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
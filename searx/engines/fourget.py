@@ -0,0 +1,53 @@
+"""All 4get engines through one module.
+
+settings.yml picks the scraper per engine entry:
+
+  - name: google4
+    engine: fourget
+    fourget_engine: google
+    categories: [general, images, videos, news]
+
+SearXNG loads a fresh copy of this module per entry and sets the entry's keys on
+it, so fourget_engine and categories are per engine. paging/time_range_support
+come from the sidecar's engine spec at init unless settings.yml sets them.
+4get_engines.py generates the entries from the spec.
+"""
+
+from fourget_hijacker_client import FourgetHijackerClient
+import logging
+logger = logging.getLogger(__name__)
+
+# Defaults for an entry without a spec; categories must come from settings.yml (registration happens before init)
+categories, paging, engine_type, time_range_support = ['general'], True, "online", True
+fourget_engine = None  # 4get scraper id, e.g. google, yahoo-japan
+configured_timeout = None  # settings.yml timeout, restored when runtime tuning goes away
+
+def request(q, p):
+    global timeout
+    # SearXNG waits engine.timeout for us; follow runtime tuning (FOURGET_TIMEOUTS_FILE) from the next search on
+    if FourgetHijackerClient.TIMEOUTS_FILE:
+        timeout = FourgetHijackerClient.tuned_timeout(fourget_engine) or configured_timeout or timeout
+    return FourgetHijackerClient.dispatch_request(fourget_engine, q, p)
+
+def response(r): return FourgetHijackerClient.dispatch_response(r, fourget_engine, logger)
+
+def init(s):
+    global paging, time_range_support, configured_timeout
+    configured_timeout = globals().get('timeout')
+    if not fourget_engine:
+        logger.error("4get engine entry without fourget_engine")
+        return False
+
+    spec = FourgetHijackerClient.engine_spec(fourget_engine)
+    if spec is None:
+        logger.warning(f"4get {fourget_engine}: not in the sidecar engine spec, keeping default paging/time range")
+    else:
+        if 'paging' not in s:
+            paging = spec['paging']
+        if 'time_range_support' not in s:
+            time_range_support = spec['time_range']
+        unsupported = set(categories) - set(spec['categories'])
+        if unsupported:
+            logger.warning(f"4get {fourget_engine}: categories {sorted(unsupported)} not supported (spec: {spec['categories']})")
+
+    return FourgetHijackerClient.init_engine(fourget_engine, s)
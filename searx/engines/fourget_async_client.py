@@ -0,0 +1,153 @@
+import time
+import random
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+from fourget_hijacker_client import FourgetHijackerClient, FourgetDeadlineExceeded
+from fourget_load_governor import LoadGovernor
+from fourget_tracing import Tracer
+from searx.exceptions import SearxEngineCaptchaException, SearxEngineTooManyRequestsException
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter:
+    """Token bucket per engine; rate in requests/second, burst tokens available up front."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFourgetClient:
+    """asyncio client for the 4get sidecar, for batch jobs outside SearXNG.
+
+    Requests are built by FourgetHijackerClient.dispatch_request (same params mapping,
+    sidecar routing and deadline as the engines) and answers go through normalize_results.
+    Captcha/429/overloaded errors, and requests that reached the sidecar past their
+    deadline, are retried with exponential backoff. The deadline is set once the request
+    is through the rate limiter and concurrency queue. Requests go to the sidecar's bulk
+    lane unless priority='interactive'.
+
+        async with AsyncFourgetClient(concurrency=32, rate_limits={'google': 1.0}) as client:
+            results = await client.search('google', 'python asyncio')
+    """
+
+    RETRYABLE = (SearxEngineCaptchaException, SearxEngineTooManyRequestsException, FourgetDeadlineExceeded,
+                 httpx.TransportError)
+
+    def __init__(self, concurrency: int = 16, rate_limits: Optional[Dict[str, float]] = None,
+                 default_rate: float = 2.0, retries: int = 3, backoff: float = 1.0,
+                 max_backoff: float = 30.0, timeout: float = 10.0, priority: str = 'bulk'):
+        self.concurrency = concurrency
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate = default_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.priority = priority
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._limiters: Dict[str, _RateLimiter] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncFourgetClient":
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._http.aclose()
+        self._http = None
+
+    def _limiter(self, engine_id: str) -> Optional[_RateLimiter]:
+        rate = self.rate_limits.get(engine_id, self.default_rate)
+        if not rate or rate <= 0:
+            return None
+        if engine_id not in self._limiters:
+            self._limiters[engine_id] = _RateLimiter(rate)
+        return self._limiters[engine_id]
+
+    async def search(self, engine_id: str, query: str, category: str = 'general', pageno: int = 1,
+                     language: Optional[str] = None, safesearch: Optional[int] = None,
+                     time_range: Optional[str] = None, **fg_params: Any) -> list:
+        """Normalized results for one query/page. fg_params are passed as fg_* 4get filters."""
+        params: Dict[str, Any] = {'category': category, 'pageno': pageno, 'timeout': self.timeout,
+                                  FourgetHijackerClient.PRIORITY_PARAM: self.priority}
+        if language:
+            params['language'] = language
+        if safesearch is not None:
+            params['safesearch'] = safesearch
+        if time_range:
+            params['time_range'] = time_range
+        params.update({f"{FourgetHijackerClient.FG_PREFIX}{k}": v for k, v in fg_params.items()})
+
+        attempt = 0
+        while True:
+            try:
+                return await self._search_once(engine_id, query, dict(params))
+            except self.RETRYABLE as e:
+                if attempt >= self.retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+                suspended = getattr(e, 'suspended_time', None)
+                if isinstance(suspended, (int, float)) and suspended < delay:
+                    # short sidecar back-off hints (e.g. overloaded) beat the exponential default
+                    delay = max(suspended, self.backoff)
+                delay *= 1 + random.random() * 0.25
+                logger.debug(f'4get {engine_id} retry {attempt + 1} in {delay:.1f}s: {e}')
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _search_once(self, engine_id: str, query: str, params: Dict[str, Any]) -> list:
+        params = FourgetHijackerClient.dispatch_request(engine_id, query, params)
+        if not params.get('url'):
+            return []  # quarantined by canary probes
+
+        limiter = self._limiter(engine_id)
+        if limiter is not None:
+            await limiter.acquire()
+
+        async with self._semaphore:
+            # Time spent queued above would otherwise come off the sidecar's deadline
+            params['json']['deadline'] = FourgetHijackerClient._deadline(engine_id, params)
+            resp = await self._http.post(params['url'], json=params['json'], headers=params.get('headers'))
+
+        trace = params.get(Tracer.PARAM_KEY)
+        results, error, challenge = None, None, False
+        try:
+            resp.raise_for_status()
+            if trace is None:
+                results = FourgetHijackerClient.normalize_results(resp.json())
+            else:
+                results = FourgetHijackerClient._run_traced(trace, resp, {})
+            return results
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            challenge = FourgetHijackerClient._is_challenge(e)
+            raise
+        finally:
+            if LoadGovernor.ENABLED:
+                LoadGovernor.observe(engine_id, resp, error is not None, challenge, params=params)
+            if trace is not None:
+                Tracer.finish(trace, resp, results, error)
+
@@ -0,0 +1,134 @@
+import os
+import json
+import mmap
+import time
+import itertools
+import multiprocessing
+from datetime import datetime
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from fourget_hijacker_client import FourgetHijackerClient
+import logging
+
+logger = logging.getLogger(__name__)
+
+_field = None  # set per worker: pull the raw document out of a wrapper record (e.g. 'raw' in shadow logs)
+
+
+def iter_jsonl(path: str) -> Iterator[bytes]:
+    """Lines of a JSONL file via mmap, left undecoded so workers parse them."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line = mm[start:end].strip()
+                if line:
+                    yield line
+                start = end + 1
+
+
+def normalize_many(source: Any, workers: Optional[int] = None, chunksize: int = 64, field: Optional[str] = None,
+                   progress: Optional[Callable[[int, float], None]] = None,
+                   report_every: float = 5.0) -> Iterator[Tuple[list, Optional[str]]]:
+    """Run normalize_results over many raw sidecar responses, yielding (results, error) in input order.
+
+    source is an iterable of documents (dicts, JSON str/bytes) or a JSONL file path.
+    Documents are sent to a process pool in chunks; at most workers * 4 chunks are in
+    flight, so huge archives stream with bounded memory. field picks the raw document
+    out of each record (e.g. field='raw' for FOURGET_SHADOW_RAW logs). progress is
+    called every report_every seconds with (documents done, documents/second).
+    workers=1 runs in-process.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = iter_jsonl(os.fspath(source))
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(source, chunksize)
+    progress = progress or (lambda done, rate: logger.info(f'normalize_many: {done} docs, {rate:.0f} docs/s'))
+
+    started = time.monotonic()
+    reported = started
+    done = 0
+
+    if workers == 1:
+        _init_worker(field)
+        batches = map(_normalize_chunk, chunks)
+        pool = None
+    else:
+        pool = multiprocessing.get_context().Pool(workers, initializer=_init_worker, initargs=(field,))
+        batches = _ordered(pool, chunks, workers * 4)
+
+    try:
+        for batch in batches:
+            for item in batch:
+                yield item
+            done += len(batch)
+            now = time.monotonic()
+            if now - reported >= report_every:
+                progress(done, done / (now - started))
+                reported = now
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    elapsed = time.monotonic() - started
+    progress(done, done / elapsed if elapsed > 0 else 0.0)
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered(pool: Any, chunks: Iterator[list], window: int) -> Iterator[list]:
+    """Like pool.imap, but only reads ahead `window` chunks instead of draining the input."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(_normalize_chunk, (chunk,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _init_worker(field: Optional[str]):
+    global _field
+    _field = field
+
+
+def _normalize_chunk(chunk: list) -> list:
+    out = []
+    for doc in chunk:
+        try:
+            if isinstance(doc, (bytes, str)):
+                doc = json.loads(doc)
+            if _field is not None:
+                doc = doc[_field]
+            out.append((FourgetHijackerClient.normalize_results(doc), None))
+        except Exception as e:
+            out.append(([], f"{type(e).__name__}: {e}"))
+    return out
+
+
+def jsonable(obj: Any) -> Any:
+    """json.dumps default= hook for normalized results (datetimes, SearXNG result objects)."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    as_dict = getattr(obj, 'as_dict', None)
+    if callable(as_dict):
+        return as_dict()
+    fields = getattr(obj, '__struct_fields__', None)
+    if fields:
+        return {f: getattr(obj, f, None) for f in fields}
+    return str(obj)
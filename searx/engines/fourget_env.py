@@ -0,0 +1,9 @@
+import os
+
+
+def env_float(name: str, default: float) -> float:
+    """Float setting from the environment; unset or unparsable values fall back to the default."""
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
@@ -1,10 +1,25 @@
 import re
+import os
+import glob
+import json
+import random
+import cProfile
+import pstats
+import threading
+import tracemalloc
+import urllib.request
+from collections import Counter
 from typing import Dict, Any, Optional
 from datetime import datetime
 import time
 from urllib.parse import urlparse, unquote_plus
 from html import unescape
 from searx.result_types import Answer
+from fourget_env import env_float
+from fourget_sidecar_pool import get_pool
+from fourget_shadow import ShadowRecorder
+from fourget_load_governor import LoadGovernor
+from fourget_tracing import Tracer
 from searx.exceptions import (
     SearxEngineCaptchaException,
     SearxEngineTooManyRequestsException,
@@ -29,10 +44,17 @@ _BROKEN_IMAGE_RE = re.compile(
     re.IGNORECASE
 )
 _WHITESPACE_RE = re.compile(r'\s+')
+_UNSAFE_FILENAME_RE = re.compile(r'[^a-zA-Z0-9_.-]')
+_BLOCK_RE = re.compile(r'blocked|forbidden|403', re.IGNORECASE)
+
+
+class FourgetDeadlineExceeded(SearxEngineResponseException):
+    """The request reached the sidecar after its deadline, before anything was scraped: safe to send again."""
+
 
 class FourgetHijackerClient:
     MAX_CONTENT_LENGTH = 5000
-    DEFAULT_PAGE_SIZE = 10  # 4get engines return ~10 results per page
+    DEFAULT_PAGE_SIZE = 10  # results per SearXNG page; the sidecar slices larger upstream batches to this
 
     # --- Constants ---
     NSFW_MAP = {0: "yes", 1: "maybe", 2: "no"}
@@ -45,6 +67,55 @@ class FourgetHijackerClient:
     _NORMALIZERS = {}  # Populated at end of class to avoid undefined references
     _TEMPLATES = {"image": "images.html", "video": "videos.html"}
 
+    # Result types that belong to each 4get method; the rest are carousels (dropped at degrade level 3)
+    PRIMARY_TYPES = {
+        "web": frozenset(["web"]),
+        "image": frozenset(["image"]),
+        "video": frozenset(["video", "livestream", "reel"]),
+        "news": frozenset(["news"]),
+        "music": frozenset(["song", "podcast", "playlist", "album", "author", "user"]),
+    }
+    DEGRADED_MAX_ITEMS = 10  # per result type at degrade level >= 2
+
+    # --- Sampling profiler (FOURGET_PROFILE_RATE=0 disables) ---
+    PROFILE_RATE = env_float('FOURGET_PROFILE_RATE', 0.0)
+    PROFILE_DIR = os.environ.get('FOURGET_PROFILE_DIR', '/tmp/4get-profiles')
+    PROFILE_FLUSH_EVERY = 50  # samples aggregated into one dump
+    PROFILE_KEEP = 10  # dumps retained per engine
+    PROFILE_TOP_ALLOCS = 25
+
+    _profile_lock = threading.Lock()
+    _profile_state = {}  # engine_id -> {"stats": pstats.Stats, "allocs": Counter, "samples": int}
+
+    # --- fg_ settings validation against the sidecar filter catalog ---
+    FG_PREFIX = "fg_"
+    CATALOG_TIMEOUT = 5.0
+    FREEFORM_FILTERS = frozenset(["_DATE", "_SEARCH"])  # 4get option placeholders for free input
+
+    _filter_catalog = None  # engine -> page -> {filter: {"display": ..., "option": {...} | "_DATE"}}
+    _engine_specs = None  # engine -> {"methods", "categories", "paging", "time_range"} from engines.php
+    _catalog_lock = threading.Lock()
+    _ENGINE_PARAMS = {}  # engine_id -> validated fg_ settings from settings.yml
+
+    # --- Deadline propagation ---
+    DEFAULT_TIMEOUT = 3.0  # SearXNG's outgoing.request_timeout default
+    DEADLINE_MARGIN = 0.15  # seconds reserved for the response hop + normalization
+    _ENGINE_TIMEOUTS = {}  # engine_id -> timeout from settings.yml
+
+    # --- Runtime timeout tuning (4get_timeouts.py --apply writes FOURGET_TIMEOUTS_FILE) ---
+    TIMEOUTS_FILE = os.environ.get('FOURGET_TIMEOUTS_FILE', '')
+    TUNED_FACTORS = (0.5, 2.0)  # a tuned timeout stays within these multiples of the settings.yml one
+    TUNED_BOUNDS = (1.0, 10.0)  # and within these seconds
+    TUNED_RELOAD = 30.0  # seconds between mtime checks
+    TUNED_MAX_AGE = 7 * 86400  # older files are ignored: the data behind them went stale
+    _tuned = {}
+    _tuned_checked = 0.0
+    _tuned_mtime = None
+
+    # --- Sidecar priority lanes (bulkhead.php) ---
+    PRIORITIES = ('interactive', 'bulk')
+    PRIORITY_PARAM = 'fourget_priority'  # per-request override, e.g. set by AsyncFourgetClient
+    _ENGINE_PRIORITY = {}  # engine_id -> fourget_priority from settings.yml
 
     @staticmethod
     def dispatch_request(engine_id: str, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -66,30 +137,382 @@ class FourgetHijackerClient:
             category = 'video'
 
 
+        pool = get_pool()
+        endpoint = pool.route(engine_id, query)
+        if pool.engine_state(endpoint, engine_id, category) == 'quarantined':
+            # url=None makes SearXNG skip the request instead of burning the timeout
+            logger.debug(f'4get {engine_id}/{category} quarantined by canary probes, skipping')
+            params['url'] = None
+            return params
+
+        deadline = FourgetHijackerClient._deadline(engine_id, params)
+        timeout = deadline - time.time() + FourgetHijackerClient.DEADLINE_MARGIN  # the engine timeout
+        if ShadowRecorder.RATE:
+            ShadowRecorder.maybe_start(engine_id, query, params, timeout)
+
+        traceparent = Tracer.start(engine_id, category, params) if Tracer.ENDPOINT else None
+        if traceparent:
+            params.setdefault('headers', {})['traceparent'] = traceparent
+
+        if LoadGovernor.ENABLED:
+            LoadGovernor.dispatched(engine_id, params, timeout)
+
         params.update({
-            'url': 'http://4get-hijacked:80/harness.php',
+            'url': f"{endpoint}/harness.php",
             'method': 'POST',
             'json': {
                 'engine': engine_id,
                 'category': category,
+                'deadline': deadline,
+                'limit': FourgetHijackerClient.DEFAULT_PAGE_SIZE,
+                'degrade': LoadGovernor.level(engine_id) if LoadGovernor.ENABLED else 0,
+                'priority': FourgetHijackerClient._priority(engine_id, params),
+                'trace': traceparent,
                 'params': fourget_params
             }
         })
         return params
 
+    @staticmethod
+    def _priority(engine_id: str, params: Dict[str, Any]) -> str:
+        """Sidecar lane: per-request param, else the engine's setting, else interactive."""
+        priority = params.get(FourgetHijackerClient.PRIORITY_PARAM) if hasattr(params, 'get') else None
+        priority = priority or FourgetHijackerClient._ENGINE_PRIORITY.get(engine_id)
+        return priority if priority in FourgetHijackerClient.PRIORITIES else 'interactive'
+
+    @staticmethod
+    def _deadline(engine_id: str, params: Dict[str, Any]) -> float:
+        """Absolute epoch by which the sidecar must answer, derived from the engine timeout."""
+        timeout = params.get('timeout') if hasattr(params, 'get') else None
+        if not timeout:
+            timeout = FourgetHijackerClient.tuned_timeout(engine_id) or \
+                FourgetHijackerClient._ENGINE_TIMEOUTS.get(engine_id, FourgetHijackerClient.DEFAULT_TIMEOUT)
+        return round(time.time() + max(float(timeout) - FourgetHijackerClient.DEADLINE_MARGIN, 0.1), 3)
+
+    @staticmethod
+    def tuned_timeout(engine_id: str) -> Optional[float]:
+        """Runtime-tuned timeout for engine_id from FOURGET_TIMEOUTS_FILE (within guard rails), or None."""
+        if not FourgetHijackerClient.TIMEOUTS_FILE:
+            return None
+        FourgetHijackerClient._reload_tuned()
+        return FourgetHijackerClient._tuned.get(engine_id)
+
+    @staticmethod
+    def _reload_tuned():
+        now = time.time()
+        if now - FourgetHijackerClient._tuned_checked < FourgetHijackerClient.TUNED_RELOAD:
+            return
+        FourgetHijackerClient._tuned_checked = now
+
+        path = FourgetHijackerClient.TIMEOUTS_FILE
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            FourgetHijackerClient._tuned, FourgetHijackerClient._tuned_mtime = {}, None
+            return
+        if now - mtime > FourgetHijackerClient.TUNED_MAX_AGE:
+            if FourgetHijackerClient._tuned:
+                logger.warning(f'4get tuned timeouts in {path} are older than {FourgetHijackerClient.TUNED_MAX_AGE}s, using settings.yml')
+            FourgetHijackerClient._tuned, FourgetHijackerClient._tuned_mtime = {}, None
+            return
+        if mtime == FourgetHijackerClient._tuned_mtime:
+            return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f'4get tuned timeouts unreadable ({path}): {e}')
+            return  # keep the last good values
+
+        low_factor, high_factor = FourgetHijackerClient.TUNED_FACTORS
+        low_bound, high_bound = FourgetHijackerClient.TUNED_BOUNDS
+        tuned = {}
+        for engine_id, value in (raw.items() if isinstance(raw, dict) else []):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            configured = FourgetHijackerClient._ENGINE_TIMEOUTS.get(engine_id, FourgetHijackerClient.DEFAULT_TIMEOUT)
+            clamped = min(max(value, configured * low_factor, low_bound), configured * high_factor, high_bound)
+            if clamped != value:
+                logger.warning(f'4get {engine_id}: tuned timeout {value}s clamped to {clamped}s')
+            tuned[engine_id] = round(clamped, 2)
+
+        logger.info(f'4get tuned timeouts loaded from {path}: {tuned}')
+        FourgetHijackerClient._tuned, FourgetHijackerClient._tuned_mtime = tuned, mtime
+
     @staticmethod
     def dispatch_response(resp: Any, engine_id: str, logger: Any) -> list:
         """Centralized response handler with error hoisting."""
+        sent = FourgetHijackerClient._sent_payload(resp)
+        options = {
+            "degrade": sent.get("degrade") or 0,
+            "primary_types": FourgetHijackerClient.PRIMARY_TYPES.get(sent.get("category")),
+        }
+
+        trace = Tracer.context(resp) if Tracer.ENDPOINT else None
+        results, error, challenge = None, None, False
         try:
-            return FourgetHijackerClient.normalize_results(resp.json())
+            rate = FourgetHijackerClient.PROFILE_RATE
+            if rate and random.random() < rate:
+                results = FourgetHijackerClient._run_profiled(engine_id, resp, options)
+            elif trace is not None:
+                results = FourgetHijackerClient._run_traced(trace, resp, options)
+            else:
+                results = FourgetHijackerClient.normalize_results(resp.json(), **options)
         except (SearxEngineCaptchaException, 
                 SearxEngineTooManyRequestsException, 
-                SearxEngineResponseException):
+                SearxEngineResponseException) as e:
+            error = f"{type(e).__name__}: {e}"
+            challenge = FourgetHijackerClient._is_challenge(e)
             # Re-raise SearXNG exceptions for the engine supervisor to handle
             raise
         except Exception as e:
             logger.debug(f'4get {engine_id} response error: {e}')
-            return []
+            error = f"{type(e).__name__}: {e}"
+            results = []
+        finally:
+            if LoadGovernor.ENABLED:
+                LoadGovernor.observe(engine_id, resp, error is not None, challenge)
+            if ShadowRecorder.RATE:
+                ShadowRecorder.record_fourget(resp, results, error)
+            if trace is not None:
+                Tracer.finish(trace, resp, results, error)
+
+        return results
+
+    @staticmethod
+    def _sent_payload(resp: Any) -> Dict[str, Any]:
+        """The harness payload dispatch_request built for this response (via resp.search_params)."""
+        params = getattr(resp, 'search_params', None)
+        payload = params.get('json') if hasattr(params, 'get') else None
+        return payload if isinstance(payload, dict) else {}
+
+    @staticmethod
+    def _is_challenge(error: Exception) -> bool:
+        """Captcha, block page or solver challenge (as raised by normalize_results), not load."""
+        return isinstance(error, SearxEngineCaptchaException) or bool(_BLOCK_RE.search(str(error)))
+
+    # --- Tracing ---
+
+    @staticmethod
+    def _run_traced(trace: Dict[str, Any], resp: Any, options: Dict[str, Any]) -> list:
+        """Decode + normalize with a span each."""
+        started = trace.setdefault('received', time.time_ns())
+        data = resp.json()
+        decoded = time.time_ns()
+        Tracer.span(trace, 'decode', started, decoded, attributes={'http.response.body.size': len(resp.content or b'')})
+
+        results = None
+        try:
+            results = FourgetHijackerClient.normalize_results(data, **options)
+            return results
+        finally:
+            Tracer.span(trace, 'normalize', decoded, time.time_ns(), attributes={
+                'fourget.results': len(results) if results is not None else None,
+            })
+
+    # --- Profiling ---
+
+    @staticmethod
+    def _run_profiled(engine_id: str, resp: Any, options: Dict[str, Any]) -> list:
+        """Decode + normalize under cProfile/tracemalloc. Skips profiling if another sample is in flight."""
+        lock = FourgetHijackerClient._profile_lock
+        if not lock.acquire(blocking=False):
+            return FourgetHijackerClient.normalize_results(resp.json(), **options)
+
+        try:
+            owns_tracemalloc = not tracemalloc.is_tracing()
+            if owns_tracemalloc:
+                tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return FourgetHijackerClient.normalize_results(resp.json(), **options)
+            finally:
+                profiler.disable()
+                snapshot = tracemalloc.take_snapshot()
+                if owns_tracemalloc:
+                    tracemalloc.stop()
+                try:
+                    FourgetHijackerClient._record_profile(engine_id, profiler, snapshot)
+                except Exception as e:
+                    logger.debug(f'4get {engine_id} profile write failed: {e}')
+        finally:
+            lock.release()
+
+    @staticmethod
+    def _record_profile(engine_id: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot):
+        """Aggregate one sample into the engine's running profile; flush every PROFILE_FLUSH_EVERY samples."""
+        state = FourgetHijackerClient._profile_state.get(engine_id)
+        if state is None:
+            state = {"stats": None, "allocs": Counter(), "samples": 0}
+            FourgetHijackerClient._profile_state[engine_id] = state
+
+        if state["stats"] is None:
+            state["stats"] = pstats.Stats(profiler)
+        else:
+            state["stats"].add(profiler)
+
+        for stat in snapshot.statistics('lineno')[:FourgetHijackerClient.PROFILE_TOP_ALLOCS]:
+            state["allocs"][str(stat.traceback[0])] += stat.size
+
+        state["samples"] += 1
+        if state["samples"] >= FourgetHijackerClient.PROFILE_FLUSH_EVERY:
+            FourgetHijackerClient._flush_profile(engine_id, state)
+            del FourgetHijackerClient._profile_state[engine_id]
+
+    @staticmethod
+    def _flush_profile(engine_id: str, state: Dict[str, Any]):
+        """Write <engine>-<ts>.prof (pstats) and .alloc.txt, keeping the newest PROFILE_KEEP per engine."""
+        profile_dir = FourgetHijackerClient.PROFILE_DIR
+        os.makedirs(profile_dir, exist_ok=True)
+
+        safe_id = _UNSAFE_FILENAME_RE.sub('_', engine_id)
+        base = os.path.join(profile_dir, f"{safe_id}-{int(time.time() * 1000)}")
+
+        state["stats"].dump_stats(base + ".prof")
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"# {engine_id}: {state['samples']} samples, bytes still allocated at sample end\n")
+            for site, size in state["allocs"].most_common(FourgetHijackerClient.PROFILE_TOP_ALLOCS):
+                f.write(f"{size:>12} {site}\n")
+
+        # Only <engine>-<digits>: "yahoo-*" would also match yahoo-japan's dumps
+        for ext in (".prof", ".alloc.txt"):
+            own = re.compile(re.escape(safe_id) + r"-\d+" + re.escape(ext) + "$")
+            dumps = sorted(
+                path for path in glob.glob(os.path.join(profile_dir, f"{safe_id}-[0-9]*{ext}"))
+                if own.match(os.path.basename(path))
+            )
+            for old in dumps[:-FourgetHijackerClient.PROFILE_KEEP]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    # --- Engine init / fg_ validation ---
+
+    @staticmethod
+    def init_engine(engine_id: str, engine_settings: Dict[str, Any]) -> bool:
+        """Validate and normalize fg_* engine settings against the sidecar's filter catalog.
+
+        Returns False (engine fails to initialize) on unknown filters or invalid values.
+        If the catalog can't be fetched the settings are forwarded unchecked.
+        """
+        engine_settings = engine_settings or {}
+        try:
+            if engine_settings.get('timeout'):
+                FourgetHijackerClient._ENGINE_TIMEOUTS[engine_id] = float(engine_settings['timeout'])
+        except (TypeError, ValueError):
+            pass
+
+        priority = engine_settings.get(FourgetHijackerClient.PRIORITY_PARAM)
+        if priority is not None:
+            if priority not in FourgetHijackerClient.PRIORITIES:
+                logger.error(f'4get {engine_id}: fourget_priority must be one of {FourgetHijackerClient.PRIORITIES}')
+                return False
+            FourgetHijackerClient._ENGINE_PRIORITY[engine_id] = priority
+
+        prefix = FourgetHijackerClient.FG_PREFIX
+        raw = {k[len(prefix):]: v for k, v in engine_settings.items() if k.startswith(prefix)}
+        if not raw:
+            return True
+
+        catalog = FourgetHijackerClient._get_filter_catalog(engine_id)
+        engine_filters = FourgetHijackerClient._engine_filters(catalog, engine_id)
+        if engine_filters is None:
+            logger.warning(f'4get {engine_id}: filter catalog unavailable, fg_ settings not validated')
+            FourgetHijackerClient._ENGINE_PARAMS[engine_id] = raw
+            return True
+
+        validated = {}
+        errors = []
+        for key, value in raw.items():
+            if key not in engine_filters:
+                errors.append(f"unknown filter fg_{key} (known: {', '.join(sorted(engine_filters))})")
+                continue
+            try:
+                validated[key] = FourgetHijackerClient._normalize_filter_value(value, engine_filters[key])
+            except ValueError as e:
+                errors.append(f"fg_{key}: {e}")
+
+        if errors:
+            logger.error(f'4get {engine_id}: invalid settings: {"; ".join(errors)}')
+            return False
+
+        FourgetHijackerClient._ENGINE_PARAMS[engine_id] = validated
+        return True
+
+    @staticmethod
+    def _get_filter_catalog(engine_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch the full filter catalog from the sidecar once per process."""
+        return FourgetHijackerClient._cached_catalog(engine_id, "filters.php", "_filter_catalog")
+
+    @staticmethod
+    def engine_spec(engine_id: str) -> Optional[Dict[str, Any]]:
+        """Methods, categories, paging and time range support of one 4get engine, or None if unknown."""
+        specs = FourgetHijackerClient._cached_catalog(engine_id, "engines.php", "_engine_specs")
+        return (specs or {}).get(engine_id.replace('-', '_'))
+
+    @staticmethod
+    def _cached_catalog(engine_id: str, script: str, attr: str) -> Optional[Dict[str, Any]]:
+        """GET a sidecar catalog (filters.php, engines.php) once per process into class attribute attr."""
+        if getattr(FourgetHijackerClient, attr) is not None:
+            return getattr(FourgetHijackerClient, attr)
+
+        with FourgetHijackerClient._catalog_lock:
+            if getattr(FourgetHijackerClient, attr) is None:
+                url = get_pool().url(engine_id, "", script)
+                try:
+                    with urllib.request.urlopen(url, timeout=FourgetHijackerClient.CATALOG_TIMEOUT) as resp:
+                        catalog = json.loads(resp.read())
+                    # An empty list is the sidecar's error reply; don't cache it so later engines retry
+                    if isinstance(catalog, dict) and catalog:
+                        setattr(FourgetHijackerClient, attr, catalog)
+                    else:
+                        return None
+                except Exception as e:
+                    logger.debug(f'4get {script} fetch failed: {e}')
+                    return None
+
+        return getattr(FourgetHijackerClient, attr)
+
+    @staticmethod
+    def _engine_filters(catalog: Optional[Dict[str, Any]], engine_id: str) -> Optional[Dict[str, Any]]:
+        """Union of an engine's filters across all pages, or None if the engine isn't catalogued."""
+        if not catalog:
+            return None
+        pages = catalog.get(engine_id.replace('-', '_'))
+        if not isinstance(pages, dict):
+            return None
+
+        merged = {}
+        for filters in pages.values():
+            if isinstance(filters, dict):
+                for name, spec in filters.items():
+                    merged.setdefault(name, spec.get("option") if isinstance(spec, dict) else None)
+        return merged
+
+    @staticmethod
+    def _normalize_filter_value(value: Any, options: Any) -> Any:
+        """Map a settings.yml value onto one of the filter's option keys (bools become yes/no)."""
+        if isinstance(options, list):
+            options = {str(i): label for i, label in enumerate(options)}
+        if not isinstance(options, dict):
+            # Free input (_DATE/_SEARCH) or unknown shape: forward as-is
+            return value
+
+        if isinstance(value, bool):
+            candidates = ["yes", "true", "1"] if value else ["no", "false", "0"]
+        else:
+            candidates = [str(value), str(value).strip().lower()]
+
+        for candidate in candidates:
+            if candidate in options:
+                return candidate
+
+        raise ValueError(f"invalid value {value!r} (allowed: {', '.join(map(str, options))})")
 
     @staticmethod
     def get_4get_params(query: str, params: Dict[str, Any], engine_name: str = None) -> Dict[str, Any]:
@@ -122,7 +545,10 @@ class FourgetHijackerClient:
         if pageno and pageno > 1:
             fourget_params["offset"] = (pageno - 1) * FourgetHijackerClient.DEFAULT_PAGE_SIZE
 
-        prefix = "fg_"
+        if engine_name in FourgetHijackerClient._ENGINE_PARAMS:
+            fourget_params.update(FourgetHijackerClient._ENGINE_PARAMS[engine_name])
+
+        prefix = FourgetHijackerClient.FG_PREFIX
         for k, v in params.items():
             if k.startswith(prefix):
                 raw_key = k[len(prefix):]
@@ -233,7 +659,12 @@ class FourgetHijackerClient:
     # --- Normalization Logic ---
 
     @staticmethod
-    def normalize_results(response_data: Any):
+    def normalize_results(response_data: Any, degrade: int = 0, primary_types: Optional[frozenset] = None):
+        """Map a sidecar response to SearXNG results.
+
+        degrade (see LoadGovernor): 1 skips related/answers, 2 caps items per type and
+        drops web enrichment, 3 keeps only primary_types.
+        """
         results = []
         if not isinstance(response_data, dict):
             return results
@@ -242,13 +673,27 @@ class FourgetHijackerClient:
         if response_data.get("status") == "error":
             msg = response_data.get('message', 'Unknown error')
             msg_l = msg.lower()
-            
+
+            # Sidecar bulkhead full: back off briefly rather than the long captcha/block suspensions
+            if response_data.get("code") == "overloaded":
+                retry_after = response_data.get("retry_after")
+                suspended = int(retry_after) if isinstance(retry_after, (int, float)) and retry_after > 0 else 2
+                raise SearxEngineTooManyRequestsException(suspended_time=suspended, message=msg)
+
+            # Sidecar handed the challenge to its solver: sit out the solve, not the full 5 minutes
+            if response_data.get("code") == "challenge":
+                retry_after = response_data.get("retry_after")
+                suspended = int(retry_after) if isinstance(retry_after, (int, float)) and retry_after > 0 else 20
+                raise SearxEngineCaptchaException(suspended_time=suspended, message=msg)
+
             if 'captcha' in msg_l or 'pow' in msg_l:
                 raise SearxEngineCaptchaException(suspended_time=300, message=msg)
             if 'too many requests' in msg_l or '429' in msg:
                 raise SearxEngineTooManyRequestsException(suspended_time=60, message=msg)
             if 'blocked' in msg_l or 'forbidden' in msg_l or '403' in msg:
                 raise SearxEngineTooManyRequestsException(suspended_time=300, message=msg)
+            if response_data.get("code") == "deadline" or 'deadline exceeded before scrape started' in msg_l:
+                raise FourgetDeadlineExceeded(f"4get upstream error: {msg}")
             
             raise SearxEngineResponseException(f"4get upstream error: {msg}")
 
@@ -260,14 +705,14 @@ class FourgetHijackerClient:
                 results.append({"suggestion": correction.strip()})
 
         # 2. Related
-        related_list = response_data.get("related")
+        related_list = response_data.get("related") if degrade < 1 else None
         if isinstance(related_list, list):
             for related in related_list:
                 if related and isinstance(related, str) and related.strip():
                     results.append({"suggestion": related.strip()})
 
         # 3. Answers
-        answer_list = response_data.get("answer")
+        answer_list = response_data.get("answer") if degrade < 1 else None
         if isinstance(answer_list, list):
             for answer in answer_list:
                 if not isinstance(answer, dict): continue
@@ -293,16 +738,22 @@ class FourgetHijackerClient:
             }
 
         current_ts = time.time()
+        web_normalizer = FourgetHijackerClient._normalize_web_result
+        enrich = degrade < 2
 
         for result_type, normalizer in FourgetHijackerClient._NORMALIZERS.items():
             items = response_data.get(result_type)
             if not items:
                 continue
+            if degrade >= 3 and primary_types and result_type not in primary_types:
+                continue
+            if degrade >= 2 and isinstance(items, list):
+                items = items[:FourgetHijackerClient.DEGRADED_MAX_ITEMS]
             for item in items:
                 try:
                     if not isinstance(item, dict) or FourgetHijackerClient._has_invalid_date(item, current_ts):
                         continue
-                    result = normalizer(item)
+                    result = normalizer(item, enrich=False) if not enrich and normalizer is web_normalizer else normalizer(item)
                     if result:
                         if result_type in FourgetHijackerClient._TEMPLATES:
                             result["template"] = FourgetHijackerClient._TEMPLATES[result_type]
@@ -404,7 +855,7 @@ class FourgetHijackerClient:
         return result
 
     @staticmethod
-    def _normalize_web_result(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _normalize_web_result(item: Dict[str, Any], enrich: bool = True) -> Optional[Dict[str, Any]]:
         url = FourgetHijackerClient._sanitize_url(item.get("url"))
         title = item.get("title")
 
@@ -416,7 +867,7 @@ class FourgetHijackerClient:
         content = FourgetHijackerClient._truncate_content(item.get("description"))
 
         # Enrich content with table data if present
-        table_data = item.get("table")
+        table_data = item.get("table") if enrich else None
         rich_chunks = []
 
         # Handle explicit Author field (common in Playlists/Albums)
@@ -469,7 +920,7 @@ class FourgetHijackerClient:
             else:
                 content = snippet_text
 
-        sublinks = item.get("sublink")
+        sublinks = item.get("sublink") if enrich else None
         if sublinks and isinstance(sublinks, dict):
             sitelink_anchors = []
             for sl_title, sl_url in sublinks.items():
@@ -0,0 +1,128 @@
+import os
+import time
+import itertools
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoadGovernor:
+    """Picks a degradation level per engine from its recent sidecar latency and error rate.
+
+    Levels (each includes the previous ones):
+      1 - skip related searches and answers
+      2 - cap items per result type, no sitelink/table enrichment of web results
+      3 - primary result types only (no carousels), single upstream fetch per page
+
+    Each engine is judged on its own traffic, so one slow upstream doesn't degrade the rest.
+    Dispatches that never get an answer (SearXNG timed them out, so dispatch_response never
+    runs) count as errors with latency = timeout. Captchas, blocks and solver challenges
+    don't count: trimming the response does nothing for them.
+    Escalation is immediate; recovery steps down one level per COOLDOWN seconds of calmer traffic.
+    FOURGET_DEGRADE=0 disables it.
+    """
+
+    ENABLED = os.environ.get('FOURGET_DEGRADE', '1').lower() not in ('', '0', 'false', 'no')
+    WINDOW_SECONDS = 60
+    MIN_SAMPLES = 20
+    COOLDOWN = 30.0
+    RECOMPUTE_EVERY = 1.0
+    MAX_LEVEL = 3
+    MAX_SAMPLES = 1000  # per engine
+    STALE_AFTER = 1.0  # seconds past its timeout before an unanswered dispatch counts as timed out
+    PARAM_KEY = 'fourget_dispatched'  # stashed in request params, read back via resp.search_params
+
+    # Thresholds to enter level i: (p90 latency seconds, error rate)
+    THRESHOLDS = {1: (1.5, 0.10), 2: (2.5, 0.20), 3: (4.0, 0.35)}
+
+    # engine_id -> state
+    _samples: Dict[str, deque] = {}  # deque of (ts, latency, error)
+    _lock = threading.Lock()
+    _level: Dict[str, int] = {}
+    _changed: Dict[str, float] = {}
+    _computed: Dict[str, float] = {}
+    _pending: Dict[str, Dict[int, Tuple[float, float]]] = {}  # token -> (dispatched, timeout)
+    _tokens = itertools.count()
+
+    @staticmethod
+    def dispatched(engine_id: str, params: Dict[str, Any], timeout: float):
+        """dispatch_request: remember the dispatch until observe() sees its answer."""
+        token = next(LoadGovernor._tokens)
+        params[LoadGovernor.PARAM_KEY] = token
+        with LoadGovernor._lock:
+            LoadGovernor._pending.setdefault(engine_id, {})[token] = (time.time(), timeout)
+
+    @staticmethod
+    def observe(engine_id: str, resp: Any, error: bool, challenge: bool = False,
+                params: Optional[Dict[str, Any]] = None):
+        """An answer came back; params default to resp.search_params (SearXNG)."""
+        if params is None:
+            params = getattr(resp, 'search_params', None)
+        token = params.get(LoadGovernor.PARAM_KEY) if hasattr(params, 'get') else None
+        elapsed = getattr(resp, 'elapsed', None)
+        latency = elapsed.total_seconds() if elapsed is not None else 0.0
+        with LoadGovernor._lock:
+            if token is not None:
+                LoadGovernor._pending.get(engine_id, {}).pop(token, None)
+            if not challenge:
+                LoadGovernor._engine_samples(engine_id).append((time.time(), latency, error))
+
+    @staticmethod
+    def level(engine_id: str) -> int:
+        now = time.time()
+        if now - LoadGovernor._computed.get(engine_id, 0.0) < LoadGovernor.RECOMPUTE_EVERY:
+            return LoadGovernor._level.get(engine_id, 0)
+
+        with LoadGovernor._lock:
+            LoadGovernor._computed[engine_id] = now
+            target = LoadGovernor._target_level(engine_id, now)
+            current = LoadGovernor._level.get(engine_id, 0)
+
+            if target > current:
+                LoadGovernor._set_level(engine_id, target, now)
+            elif target < current and now - LoadGovernor._changed.get(engine_id, 0.0) >= LoadGovernor.COOLDOWN:
+                LoadGovernor._set_level(engine_id, current - 1, now)
+
+        return LoadGovernor._level.get(engine_id, 0)
+
+    @staticmethod
+    def _target_level(engine_id: str, now: float) -> int:
+        samples = LoadGovernor._engine_samples(engine_id)
+        pending = LoadGovernor._pending.get(engine_id, {})
+        for token, (dispatched, timeout) in list(pending.items()):
+            if now - dispatched > timeout + LoadGovernor.STALE_AFTER:
+                del pending[token]
+                samples.append((now, timeout, True))
+
+        while samples and samples[0][0] < now - LoadGovernor.WINDOW_SECONDS:
+            samples.popleft()
+
+        snapshot = list(samples)
+        if len(snapshot) < LoadGovernor.MIN_SAMPLES:
+            return 0
+
+        latencies = sorted(s[1] for s in snapshot)
+        p90 = latencies[int(len(latencies) * 0.9) - 1]
+        error_rate = sum(1 for s in snapshot if s[2]) / len(snapshot)
+
+        target = 0
+        for level, (max_latency, max_errors) in sorted(LoadGovernor.THRESHOLDS.items()):
+            if p90 >= max_latency or error_rate >= max_errors:
+                target = level
+        return target
+
+    @staticmethod
+    def _engine_samples(engine_id: str) -> deque:
+        samples = LoadGovernor._samples.get(engine_id)
+        if samples is None:
+            samples = LoadGovernor._samples[engine_id] = deque(maxlen=LoadGovernor.MAX_SAMPLES)
+        return samples
+
+    @staticmethod
+    def _set_level(engine_id: str, level: int, now: float):
+        logger.warning(f'4get {engine_id} degradation level {LoadGovernor._level.get(engine_id, 0)} -> {level}')
+        LoadGovernor._level[engine_id] = level
+        LoadGovernor._changed[engine_id] = now
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import uuid
+import random
+import threading
+from typing import Any, Dict, List, Optional
+from fourget_env import env_float
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowRecorder:
+    """Shadow comparison of 4get engines against SearXNG's native engines.
+
+    For FOURGET_SHADOW_RATE of the queries sent to a paired 4get engine, the native
+    engine runs the same query in a background thread. Both sides append one JSONL
+    record each (shared shadow id) to FOURGET_SHADOW_LOG; 4get_shadow_report.py
+    turns the log into the comparison. The log doubles as the offline fixture.
+
+    SearXNG never calls dispatch_response for a 4get request it timed out, so once
+    the native side is done and the 4get timeout has passed without a 4get record,
+    the shadow thread writes one with error TIMEOUT_ERROR and latency = timeout.
+    """
+
+    RATE = env_float('FOURGET_SHADOW_RATE', 0.0)
+    LOG_PATH = os.environ.get('FOURGET_SHADOW_LOG', '/tmp/4get-shadow.jsonl')
+    KEEP_RAW = os.environ.get('FOURGET_SHADOW_RAW', '') not in ('', '0', 'false')
+    NATIVE_TIMEOUT = 10.0
+    MAX_URLS = 50
+    TIMEOUT_ERROR = 'timeout'
+    TIMEOUT_GRACE = 1.0  # seconds past the 4get timeout before its answer is given up on
+
+    # 4get engine id -> native SearXNG engine name (FOURGET_SHADOW_PAIRS=google=google,brave=brave)
+    PAIRS = dict(
+        pair.split('=', 1)
+        for pair in os.environ.get('FOURGET_SHADOW_PAIRS', 'google=google,brave=brave,duckduckgo=duckduckgo').split(',')
+        if '=' in pair
+    )
+
+    PARAM_KEY = 'fourget_shadow'  # stashed in request params, read back via resp.search_params
+
+    _write_lock = threading.Lock()
+
+    @staticmethod
+    def maybe_start(engine_id: str, query: str, params: Dict[str, Any], timeout: float):
+        """Sample this request; if chosen, start the native side and tag params for the 4get side."""
+        rate = ShadowRecorder.RATE
+        if not rate or engine_id not in ShadowRecorder.PAIRS or random.random() >= rate:
+            return
+
+        shadow = {
+            'id': uuid.uuid4().hex,
+            'pair': f"{engine_id}:{ShadowRecorder.PAIRS[engine_id]}",
+            'query': query,
+            'pageno': params.get('pageno', 1),
+            'category': params.get('category', 'general'),
+            'started': time.time(),
+            'timeout': timeout,
+            'fourget_done': False,
+        }
+        params[ShadowRecorder.PARAM_KEY] = shadow
+
+        native_params = {k: v for k, v in dict(params).items() if k not in ('url', 'json', ShadowRecorder.PARAM_KEY)}
+        threading.Thread(
+            target=ShadowRecorder._run_native,
+            args=(ShadowRecorder.PAIRS[engine_id], query, native_params, shadow),
+            name="4get-shadow",
+            daemon=True,
+        ).start()
+
+    @staticmethod
+    def record_fourget(resp: Any, results: Optional[list], error: Optional[str]):
+        """Called from dispatch_response for tagged requests."""
+        params = getattr(resp, 'search_params', None) or {}
+        shadow = params.get(ShadowRecorder.PARAM_KEY) if hasattr(params, 'get') else None
+        if not shadow or not ShadowRecorder._claim_fourget(shadow):
+            return
+
+        elapsed = getattr(resp, 'elapsed', None)
+        latency = elapsed.total_seconds() if elapsed is not None else time.time() - shadow['started']
+        record = ShadowRecorder._record(shadow, '4get', latency, results, error)
+        if ShadowRecorder.KEEP_RAW:
+            try:
+                record['raw'] = resp.json()
+            except Exception:
+                pass
+        ShadowRecorder._write(record)
+
+    @staticmethod
+    def _run_native(native_name: str, query: str, params: Dict[str, Any], shadow: Dict[str, Any]):
+        started = time.time()
+        results, error = None, None
+        try:
+            results = ShadowRecorder._search_native(native_name, query, params)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        ShadowRecorder._write(ShadowRecorder._record(shadow, 'native', time.time() - started, results, error))
+
+        wait = shadow['started'] + shadow['timeout'] + ShadowRecorder.TIMEOUT_GRACE - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        if ShadowRecorder._claim_fourget(shadow):
+            ShadowRecorder._write(ShadowRecorder._record(shadow, '4get', shadow['timeout'], None, ShadowRecorder.TIMEOUT_ERROR))
+
+    @staticmethod
+    def _claim_fourget(shadow: Dict[str, Any]) -> bool:
+        """Only one 4get record per shadow id: the answer, or the timeout written in its place."""
+        with ShadowRecorder._write_lock:
+            if shadow['fourget_done']:
+                return False
+            shadow['fourget_done'] = True
+            return True
+
+    @staticmethod
+    def _search_native(native_name: str, query: str, params: Dict[str, Any]) -> list:
+        """Run a native engine's request/response cycle through SearXNG's outgoing network."""
+        from searx import network
+        from searx.engines import engines
+
+        engine = engines.get(native_name)
+        if engine is None:
+            raise LookupError(f"native engine '{native_name}' is not loaded")
+
+        params = dict(params)
+        params.update({'url': None, 'method': 'GET', 'headers': {}, 'data': {}, 'cookies': {}, 'auth': None})
+        params = engine.request(query, params) or params
+        if not params.get('url'):
+            return []
+
+        network.set_timeout_for_thread(ShadowRecorder.NATIVE_TIMEOUT, time.time())
+        network.set_context_network_name(native_name)
+        kwargs = {'headers': params['headers'], 'cookies': params['cookies']}
+        if params['data']:
+            kwargs['data'] = params['data']
+        resp = network.request(params['method'], params['url'], **kwargs)
+        resp.search_params = params
+        return list(engine.response(resp) or [])
+
+    @staticmethod
+    def _record(shadow: Dict[str, Any], side: str, latency: float, results: Optional[list], error: Optional[str]) -> Dict[str, Any]:
+        urls = ShadowRecorder.result_urls(results or [])
+        return {
+            'id': shadow['id'],
+            'pair': shadow['pair'],
+            'side': side,
+            'ts': round(shadow['started'], 3),
+            'query': shadow['query'],
+            'pageno': shadow['pageno'],
+            'category': shadow['category'],
+            'latency': round(latency, 4),
+            'count': len(urls),
+            'urls': urls[:ShadowRecorder.MAX_URLS],
+            'error': error,
+        }
+
+    @staticmethod
+    def result_urls(results: List[Any]) -> List[str]:
+        """URLs of main results (dicts or SearXNG result objects); answers/suggestions are skipped."""
+        urls = []
+        for r in results:
+            url = r.get('url') if isinstance(r, dict) else getattr(r, 'url', None)
+            if isinstance(url, str) and url:
+                urls.append(url)
+        return urls
+
+    @staticmethod
+    def _write(record: Dict[str, Any]):
+        try:
+            line = json.dumps(record, default=str)
+            with ShadowRecorder._write_lock:
+                with open(ShadowRecorder.LOG_PATH, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+        except Exception as e:
+            logger.debug(f'4get shadow record write failed: {e}')
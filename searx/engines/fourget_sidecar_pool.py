@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import bisect
+import hashlib
+import threading
+import urllib.request
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarPool:
+    """Consistent-hash routing over one or more 4get sidecars with health.php based ejection.
+
+    The same health.php probe also carries each sidecar's canary states (engine -> method ->
+    ok/degraded/quarantined), which the client checks before dispatching.
+    """
+
+    DEFAULT_ENDPOINTS = "http://4get-hijacked:80"
+    VNODES = 64  # virtual nodes per endpoint on the hash ring
+    HEALTH_INTERVAL = 10.0
+    HEALTH_TIMEOUT = 2.0
+    EJECT_AFTER = 2  # consecutive failed probes before an endpoint leaves the ring
+    READMIT_AFTER = 2  # consecutive good probes before it comes back
+
+    def __init__(self, endpoints: List[str], health_interval: float = HEALTH_INTERVAL):
+        self.endpoints = [e.rstrip('/') for e in endpoints if e.strip()] or [self.DEFAULT_ENDPOINTS]
+        self.health_interval = health_interval
+        self._healthy = {e: True for e in self.endpoints}
+        self._streak = {e: 0 for e in self.endpoints}  # +n good / -n bad probes in a row
+        self._engine_states = {e: {} for e in self.endpoints}
+        self._lock = threading.Lock()
+        self._prober = None
+
+        ring = sorted(
+            (self._hash(f"{endpoint}#{i}"), endpoint)
+            for endpoint in self.endpoints
+            for i in range(self.VNODES)
+        )
+        self._ring_keys = [k for k, _ in ring]
+        self._ring_nodes = [n for _, n in ring]
+
+    @classmethod
+    def from_env(cls) -> "SidecarPool":
+        """FOURGET_SIDECARS: comma separated base URLs, e.g. http://4get-a:80,http://4get-b:80"""
+        raw = os.environ.get('FOURGET_SIDECARS', cls.DEFAULT_ENDPOINTS)
+        try:
+            interval = float(os.environ.get('FOURGET_HEALTH_INTERVAL', cls.HEALTH_INTERVAL))
+        except ValueError:
+            interval = cls.HEALTH_INTERVAL
+        return cls(raw.split(','), health_interval=interval)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def route(self, engine_id: str, query: str) -> str:
+        """Pick the endpoint owning (engine, query); walks the ring past ejected nodes."""
+        self._ensure_prober()
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+
+        idx = bisect.bisect(self._ring_keys, self._hash(f"{engine_id}\x00{query}"))
+        count = len(self._ring_nodes)
+        for step in range(count):
+            node = self._ring_nodes[(idx + step) % count]
+            if self._healthy[node]:
+                return node
+
+        # Everything ejected: fall back to the owner rather than failing outright
+        return self._ring_nodes[idx % count]
+
+    def url(self, engine_id: str, query: str, script: str = "harness.php") -> str:
+        return f"{self.route(engine_id, query)}/{script}"
+
+    def status(self) -> Dict[str, bool]:
+        return dict(self._healthy)
+
+    def engine_state(self, endpoint: str, engine_id: str, method: str) -> str:
+        """Canary state reported by `endpoint` for (engine, method); 'ok' when unknown."""
+        methods = self._engine_states.get(endpoint, {}).get(engine_id.replace('-', '_'), {})
+        return methods.get(method, {}).get('state', 'ok')
+
+    # --- Health probing ---
+
+    def _ensure_prober(self):
+        if self._prober is not None or self.health_interval <= 0:
+            return
+        with self._lock:
+            if self._prober is None:
+                self._prober = threading.Thread(target=self._probe_loop, name="4get-sidecar-health", daemon=True)
+                self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            for endpoint in self.endpoints:
+                self._record_probe(endpoint, self._probe(endpoint))
+            time.sleep(self.health_interval)
+
+    def _probe(self, endpoint: str) -> bool:
+        try:
+            with urllib.request.urlopen(f"{endpoint}/health.php", timeout=self.HEALTH_TIMEOUT) as resp:
+                health = json.loads(resp.read())
+            engines = health.get('engines')
+            if isinstance(engines, dict):
+                self._engine_states[endpoint] = engines
+            return health.get('status') == 'ok'
+        except Exception as e:
+            logger.debug(f'4get sidecar probe failed for {endpoint}: {e}')
+            return False
+
+    def _record_probe(self, endpoint: str, ok: bool):
+        streak = self._streak[endpoint]
+        streak = (max(streak, 0) + 1) if ok else (min(streak, 0) - 1)
+        self._streak[endpoint] = streak
+
+        if self._healthy[endpoint] and streak <= -self.EJECT_AFTER:
+            self._healthy[endpoint] = False
+            logger.warning(f'4get sidecar {endpoint} ejected after {-streak} failed health checks')
+        elif not self._healthy[endpoint] and streak >= self.READMIT_AFTER:
+            self._healthy[endpoint] = True
+            logger.info(f'4get sidecar {endpoint} readmitted')
+
+
+_pool: Optional[SidecarPool] = None
+
+
+def get_pool() -> SidecarPool:
+    global _pool
+    if _pool is None:
+        _pool = SidecarPool.from_env()
+    return _pool
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import random
+import secrets
+import threading
+import urllib.request
+from collections import deque
+from typing import Any, Dict, List, Optional
+from fourget_env import env_float
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Distributed traces of 4get requests, exported as OTLP/HTTP JSON.
+
+    dispatch_request starts a trace for FOURGET_TRACE_RATE of the requests and sends
+    its context as a W3C traceparent (header + harness payload), so the sidecar's
+    spans (trace.php) join it. Client-side spans:
+
+      4get.search      dispatch_request -> end of dispatch_response
+        searxng.queue  until the HTTP request went out (SearXNG scheduling, request building)
+        sidecar.http   the HTTP round trip (parent of the sidecar's spans)
+        decode         resp.json()
+        normalize      normalize_results
+
+    Spans are queued and posted in batches by a daemon thread to FOURGET_OTLP_ENDPOINT
+    (e.g. http://otel-collector:4318/v1/traces). Unset = off.
+    """
+
+    ENDPOINT = os.environ.get('FOURGET_OTLP_ENDPOINT', '')
+    RATE = env_float('FOURGET_TRACE_RATE', 1.0)
+    SERVICE = os.environ.get('FOURGET_TRACE_SERVICE', 'searxng-4get')
+    PARAM_KEY = 'fourget_trace'  # stashed in request params, read back via resp.search_params
+
+    FLUSH_INTERVAL = 2.0
+    BATCH_SIZE = 512
+    MAX_QUEUED = 4096  # oldest spans are dropped when the collector can't keep up
+    EXPORT_TIMEOUT = 2.0
+
+    # OTLP span kinds
+    INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+    _queue = deque(maxlen=MAX_QUEUED)
+    _lock = threading.Lock()
+    _exporter = None
+
+    @staticmethod
+    def start(engine_id: str, category: str, params: Dict[str, Any]) -> Optional[str]:
+        """Sample this request; if chosen, tag params with the trace and return its traceparent."""
+        if not Tracer.ENDPOINT or random.random() >= Tracer.RATE:
+            return None
+
+        trace = {
+            'trace_id': secrets.token_hex(16),
+            'root': secrets.token_hex(8),
+            'http': secrets.token_hex(8),
+            'started': time.time_ns(),
+            'engine': engine_id,
+            'category': category,
+            'spans': [],
+        }
+        params[Tracer.PARAM_KEY] = trace
+        return f"00-{trace['trace_id']}-{trace['http']}-01"
+
+    @staticmethod
+    def context(resp: Any) -> Optional[Dict[str, Any]]:
+        """The trace dispatch_request started for this response, if it was sampled."""
+        params = getattr(resp, 'search_params', None)
+        return params.get(Tracer.PARAM_KEY) if hasattr(params, 'get') else None
+
+    @staticmethod
+    def span(trace: Dict[str, Any], name: str, start_ns: int, end_ns: int, parent: Optional[str] = None,
+             kind: int = INTERNAL, attributes: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Add a finished span to the trace (parent defaults to the root span)."""
+        span = {
+            'traceId': trace['trace_id'],
+            'spanId': secrets.token_hex(8),
+            'parentSpanId': parent or trace['root'],
+            'name': name,
+            'kind': kind,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(max(end_ns, start_ns)),
+            'attributes': Tracer._attributes(attributes or {}),
+        }
+        if error:
+            span['status'] = {'code': 2, 'message': error}
+        trace['spans'].append(span)
+        return span
+
+    @staticmethod
+    def finish(trace: Dict[str, Any], resp: Any, results: Optional[list], error: Optional[str]):
+        """Close the root and HTTP spans and queue the trace for export."""
+        end = time.time_ns()
+        received = trace.get('received', end)
+        elapsed = getattr(resp, 'elapsed', None)
+        sent = received - int(elapsed.total_seconds() * 1e9) if elapsed is not None else trace['started']
+        sent = max(sent, trace['started'])
+
+        Tracer.span(trace, 'searxng.queue', trace['started'], sent)
+        http = Tracer.span(trace, 'sidecar.http', sent, received, kind=Tracer.CLIENT, attributes={
+            'http.response.status_code': getattr(resp, 'status_code', None),
+        })
+        http['spanId'] = trace['http']  # the id the sidecar was handed as its parent
+        root = Tracer.span(trace, '4get.search', trace['started'], end, kind=Tracer.SERVER, attributes={
+            'fourget.engine': trace['engine'],
+            'fourget.category': trace['category'],
+            'fourget.results': len(results) if results is not None else 0,
+        }, error=error)
+        root['spanId'] = trace['root']
+        del root['parentSpanId']
+
+        with Tracer._lock:
+            Tracer._queue.extend(trace['spans'])
+            if Tracer._exporter is None:
+                Tracer._exporter = threading.Thread(target=Tracer._export_loop, name="4get-tracer", daemon=True)
+                Tracer._exporter.start()
+        trace['spans'] = []
+
+    @staticmethod
+    def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        attributes = []
+        for key, value in values.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                typed = {'boolValue': value}
+            elif isinstance(value, int):
+                typed = {'intValue': str(value)}
+            elif isinstance(value, float):
+                typed = {'doubleValue': value}
+            else:
+                typed = {'stringValue': str(value)}
+            attributes.append({'key': key, 'value': typed})
+        return attributes
+
+    @staticmethod
+    def _export_loop():
+        while True:
+            time.sleep(Tracer.FLUSH_INTERVAL)
+            while True:
+                with Tracer._lock:
+                    batch = [Tracer._queue.popleft() for _ in range(min(len(Tracer._queue), Tracer.BATCH_SIZE))]
+                if not batch:
+                    break
+                try:
+                    Tracer._post(batch)
+                except Exception as e:
+                    logger.debug(f'4get trace export failed ({len(batch)} spans dropped): {e}')
+                    break
+
+    @staticmethod
+    def _post(spans: List[Dict[str, Any]]):
+        body = {'resourceSpans': [{
+            'resource': {'attributes': Tracer._attributes({'service.name': Tracer.SERVICE})},
+            'scopeSpans': [{'scope': {'name': 'fourget'}, 'spans': spans}],
+        }]}
+        req = urllib.request.Request(
+            Tracer.ENDPOINT,
+            data=json.dumps(body).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(req, timeout=Tracer.EXPORT_TIMEOUT) as r:
+            r.read()
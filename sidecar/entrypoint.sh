@@ -28,10 +28,51 @@ fi
 echo "📦 Generating manifest..."
 php /var/www/html/generate_manifest.php
 
+echo "🧰 Building filter catalog..."
+php /var/www/html/generate_filters.php || echo "⚠️  Filter catalog failed, filters.php will fall back to live lookups."
+
 if ! grep -q "HostnameLookups Off" /etc/apache2/apache2.conf; then
     echo "HostnameLookups Off" >> /etc/apache2/apache2.conf
     echo "ServerName localhost" >> /etc/apache2/apache2.conf
     echo "✅ Apache DNS lookups disabled and ServerName set."
 fi
 
+if ! grep -q "Alias /metrics" /etc/apache2/apache2.conf; then
+    echo "Alias /metrics /var/www/html/metrics.php" >> /etc/apache2/apache2.conf
+    echo "✅ /metrics endpoint mapped."
+fi
+
+# Just above the client pools' idle expiry (httpx keepalive_expiry, 5s): the client drops an idle
+# connection first, and a prefork worker is never parked on one for long
+KEEPALIVE_TIMEOUT=6
+if ! grep -q "MaxKeepAliveRequests 0" /etc/apache2/apache2.conf; then
+    echo "KeepAlive On" >> /etc/apache2/apache2.conf
+    echo "MaxKeepAliveRequests 0" >> /etc/apache2/apache2.conf
+    echo "KeepAliveTimeout $KEEPALIVE_TIMEOUT" >> /etc/apache2/apache2.conf
+    echo "✅ Apache keep-alive tuned for pooled client connections."
+else
+    sed -i "/^MaxKeepAliveRequests 0$/{n;s/^KeepAliveTimeout .*/KeepAliveTimeout $KEEPALIVE_TIMEOUT/}" /etc/apache2/apache2.conf
+fi
+
+WARMUP_STATE="${FOURGET_WARMUP_STATE:-/tmp/4get-warmup.json}"
+rm -f "$WARMUP_STATE"
+if [ "${FOURGET_WARMUP:-1}" != "0" ]; then
+    echo "🚦 Warming up engines (health.php reports not ready until done)..."
+    echo "{\"state\":\"warming\",\"deadline\":$(( $(date +%s) + ${FOURGET_WARMUP_TIMEOUT:-60} ))}" > "$WARMUP_STATE"
+    php /var/www/html/warmup.php > /dev/null &
+fi
+
+echo "🐤 Starting canary prober..."
+php /var/www/html/prober.php > /dev/null &
+
+if [ "${FOURGET_WARM_TOP:-0}" -gt 0 ]; then
+    echo "🔥 Starting cache warmer..."
+    php /var/www/html/warmer.php > /dev/null &
+fi
+
+if [ -n "$FOURGET_OTLP_ENDPOINT" ]; then
+    echo "🔭 Starting trace exporter..."
+    (while sleep 2; do curl -s -o /dev/null http://127.0.0.1/traces.php; done) &
+fi
+
 exec "$@"
\ No newline at end of file
@@ -0,0 +1,249 @@
+<?php
+/**
+ * Per-engine concurrency limits with a short bounded queue, split into priority lanes.
+ *
+ * Slots and queue positions are APCu keys claimed with apcu_add (atomic) and
+ * released on shutdown; their TTL reclaims slots held by a killed worker.
+ *
+ * Lanes come from the payload's "priority": interactive (SearXNG users, default)
+ * or bulk (batch jobs). The top FOURGET_BULKHEAD_RESERVED slots of each engine are
+ * interactive-only; the rest are shared. When both lanes are waiting for shared
+ * slots they are granted in proportion to FOURGET_LANE_WEIGHTS.
+ *
+ * FOURGET_BULKHEAD          "default:8,yandex:2" concurrent scrapes per engine
+ * FOURGET_BULKHEAD_RESERVED interactive-only slots per engine (default a quarter of the limit, at least 1)
+ * FOURGET_BULKHEAD_QUEUE    waiting interactive requests per engine beyond the limit (default 4)
+ * FOURGET_BULKHEAD_WAIT_MS  max interactive queue wait before rejecting (default 250, capped by the deadline)
+ * FOURGET_LANE_WEIGHTS      "interactive:4,bulk:1" shares of contended shared slots
+ */
+class bulkhead {
+    const DEFAULT_LIMIT = 8;
+    const DEFAULT_QUEUE = 4;
+    const DEFAULT_WAIT_MS = 250;
+    const BULK_QUEUE = 16; // bulk callers tolerate waiting, not being rejected
+    const BULK_WAIT_MS = 2000;
+    const DEFAULT_WEIGHTS = ['interactive' => 4, 'bulk' => 1];
+    const LANES = ['interactive', 'bulk'];
+    const SLOT_TTL = 60; // longer than any sane scrape
+    const QUEUE_TTL = 10;
+    const GRANT_TTL = 60; // fair-share accounting window
+    const POLL_US = 10000;
+    const RETRY_AFTER = 2; // seconds the client should back off when rejected
+
+    private static $held = [];
+    private static $registered = false;
+
+    public static function limit($engine) {
+        return self::setting('FOURGET_BULKHEAD', $engine) ?? self::DEFAULT_LIMIT;
+    }
+
+    /** Interactive-only slots out of limit($engine). */
+    public static function reserved($engine) {
+        $limit = self::limit($engine);
+        $reserved = getenv('FOURGET_BULKHEAD_RESERVED');
+        $reserved = $reserved !== false ? (int)$reserved : max(1, intdiv($limit, 4));
+        return $limit > 1 ? min($reserved, $limit - 1) : 0;
+    }
+
+    public static function lane($priority) {
+        return in_array($priority, self::LANES, true) ? $priority : 'interactive';
+    }
+
+    /** Claim a scrape slot for $engine in $lane, queueing briefly. False means overloaded. */
+    public static function enter($engine, $remaining_ms = null, $lane = 'interactive') {
+        if (!function_exists('apcu_add')) {
+            return true;
+        }
+
+        $lane = self::lane($lane);
+        $queued_at = microtime(true);
+        if (self::claim_slot($engine, $lane)) {
+            self::waited($engine, $lane, 0);
+            return true;
+        }
+
+        $queue_size = self::queue_size($lane);
+        $wait_ms = $lane === 'bulk' ? self::BULK_WAIT_MS : (int)(getenv('FOURGET_BULKHEAD_WAIT_MS') ?: self::DEFAULT_WAIT_MS);
+        $position = $queue_size > 0 ? self::claim("4get_bh_queue_{$lane}_{$engine}_", 0, $queue_size, $lane, self::QUEUE_TTL) : false;
+        if ($position === false) {
+            self::rejected($engine, $lane);
+            return false;
+        }
+
+        if ($remaining_ms !== null) {
+            $wait_ms = min($wait_ms, $remaining_ms);
+        }
+        $give_up = $queued_at + $wait_ms / 1000;
+
+        $slot = false;
+        while (microtime(true) < $give_up) {
+            usleep(self::POLL_US);
+            if ($slot = self::claim_slot($engine, $lane)) {
+                break;
+            }
+        }
+
+        self::release($position);
+        self::waited($engine, $lane, microtime(true) - $queued_at);
+        if ($slot === false) {
+            self::rejected($engine, $lane);
+            return false;
+        }
+        return true;
+    }
+
+    /** engine => [limit, reserved, inflight, queued, rejected, lanes => lane => [inflight, queued, rejected]] */
+    public static function stats() {
+        $stats = [];
+        if (!class_exists('APCUIterator')) {
+            return $stats;
+        }
+        $lanes = implode('|', self::LANES);
+        foreach (new APCUIterator('/^4get_bh_(slot|queue|rejected)_/') as $entry) {
+            if (preg_match('/^4get_bh_slot_(.+)_\d+$/', $entry['key'], $m)) {
+                [$kind, $engine, $lane] = ['inflight', $m[1], self::lane($entry['value'])];
+            } elseif (preg_match("/^4get_bh_queue_($lanes)_(.+)_\\d+$/", $entry['key'], $m)) {
+                [$kind, $engine, $lane] = ['queued', $m[2], $m[1]];
+            } elseif (preg_match("/^4get_bh_rejected_($lanes)_(.+)$/", $entry['key'], $m)) {
+                [$kind, $engine, $lane] = ['rejected', $m[2], $m[1]];
+            } else {
+                continue;
+            }
+
+            if (!isset($stats[$engine])) {
+                $stats[$engine] = [
+                    'limit' => self::limit($engine), 'reserved' => self::reserved($engine),
+                    'inflight' => 0, 'queued' => 0, 'rejected' => 0, 'lanes' => []
+                ];
+                foreach (self::LANES as $l) {
+                    $stats[$engine]['lanes'][$l] = ['inflight' => 0, 'queued' => 0, 'rejected' => 0];
+                }
+            }
+            $by = $kind === 'rejected' ? $entry['value'] : 1;
+            $stats[$engine][$kind] += $by;
+            $stats[$engine]['lanes'][$lane][$kind] += $by;
+        }
+        ksort($stats);
+        return $stats;
+    }
+
+    public static function release_all() {
+        foreach (self::$held as $key => $_) {
+            apcu_delete($key);
+        }
+        self::$held = [];
+    }
+
+    /**
+     * Reserved slots (the top indices) are interactive-only and always open to it;
+     * shared slots go to whichever lane is behind its weighted share.
+     */
+    private static function claim_slot($engine, $lane) {
+        $limit = self::limit($engine);
+        $shared = $limit - self::reserved($engine);
+        $prefix = "4get_bh_slot_{$engine}_";
+
+        if ($lane === 'interactive' && ($slot = self::claim($prefix, $shared, $limit, $lane, self::SLOT_TTL))) {
+            self::granted($engine, $lane);
+            return $slot;
+        }
+        if (!self::fair_turn($engine, $lane)) {
+            return false;
+        }
+        if ($slot = self::claim($prefix, 0, $shared, $lane, self::SLOT_TTL)) {
+            self::granted($engine, $lane);
+        }
+        return $slot;
+    }
+
+    private static function fair_turn($engine, $lane) {
+        $other = $lane === 'bulk' ? 'interactive' : 'bulk';
+        if (!self::waiting($engine, $other)) {
+            return true;
+        }
+        $weights = self::weights();
+        $mine = (int)apcu_fetch("4get_bh_grant_{$lane}_{$engine}");
+        $theirs = (int)apcu_fetch("4get_bh_grant_{$other}_{$engine}");
+        return $mine * $weights[$other] <= $theirs * $weights[$lane];
+    }
+
+    private static function queue_size($lane) {
+        if ($lane === 'bulk') {
+            return self::BULK_QUEUE;
+        }
+        return (int)(getenv('FOURGET_BULKHEAD_QUEUE') !== false ? getenv('FOURGET_BULKHEAD_QUEUE') : self::DEFAULT_QUEUE);
+    }
+
+    private static function waiting($engine, $lane) {
+        for ($i = 0, $size = self::queue_size($lane); $i < $size; $i++) {
+            if (apcu_exists("4get_bh_queue_{$lane}_{$engine}_$i")) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    private static function weights() {
+        static $weights = null;
+        if ($weights === null) {
+            $weights = self::DEFAULT_WEIGHTS;
+            foreach (self::LANES as $lane) {
+                $weights[$lane] = max(1, self::setting('FOURGET_LANE_WEIGHTS', $lane) ?? $weights[$lane]);
+            }
+        }
+        return $weights;
+    }
+
+    /** "name:int,name:int" env lookup with a "default" entry. */
+    private static function setting($env, $name) {
+        static $parsed = [];
+        if (!isset($parsed[$env])) {
+            $parsed[$env] = [];
+            foreach (explode(',', getenv($env) ?: '') as $pair) {
+                $parts = explode(':', trim($pair), 2);
+                if (count($parts) === 2 && (int)$parts[1] > 0) {
+                    $parsed[$env][$parts[0]] = (int)$parts[1];
+                }
+            }
+        }
+        return $parsed[$env][$name] ?? $parsed[$env]['default'] ?? null;
+    }
+
+    private static function claim($prefix, $from, $to, $lane, $ttl) {
+        for ($i = $to - 1; $i >= $from; $i--) {
+            $key = $prefix . $i;
+            if (apcu_add($key, $lane, $ttl)) {
+                if (!self::$registered) {
+                    register_shutdown_function([self::class, 'release_all']);
+                    self::$registered = true;
+                }
+                self::$held[$key] = true;
+                return $key;
+            }
+        }
+        return false;
+    }
+
+    private static function release($key) {
+        apcu_delete($key);
+        unset(self::$held[$key]);
+    }
+
+    private static function granted($engine, $lane) {
+        $key = "4get_bh_grant_{$lane}_{$engine}";
+        apcu_add($key, 0, self::GRANT_TTL);
+        apcu_inc($key);
+    }
+
+    private static function waited($engine, $lane, $seconds) {
+        if (class_exists('telemetry')) {
+            telemetry::queue_wait($engine, $lane, $seconds);
+        }
+    }
+
+    private static function rejected($engine, $lane) {
+        $key = "4get_bh_rejected_{$lane}_{$engine}";
+        apcu_add($key, 0, 0);
+        apcu_inc($key);
+    }
+}
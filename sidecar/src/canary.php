@@ -0,0 +1,77 @@
+<?php
+/**
+ * Rolling canary stats per (engine, method), fed by prober.php through harness.php.
+ * States: ok, degraded (low success/yield or slow), quarantined (last N probes all failed).
+ */
+class canary {
+    const WINDOW = 10;
+    const QUARANTINE_AFTER = 3;
+    const DEGRADED_SUCCESS = 0.7;
+    const DEGRADED_LATENCY_MS = 4000;
+    const PREFIX = '4get_canary_';
+
+    public static function record($engine, $method, $ok, $count, $ms) {
+        $key = self::PREFIX . "$engine:$method";
+        $samples = apcu_fetch($key) ?: [];
+        $samples[] = [time(), $ok && $count > 0, $count, (int)$ms];
+        if (count($samples) > self::WINDOW) {
+            $samples = array_slice($samples, -self::WINDOW);
+        }
+        apcu_store($key, $samples, 0);
+    }
+
+    public static function summarize($samples) {
+        $n = count($samples);
+        $successes = 0;
+        $yield = 0;
+        $latencies = [];
+        foreach ($samples as [$ts, $ok, $count, $ms]) {
+            $successes += $ok ? 1 : 0;
+            $yield += $count;
+            $latencies[] = $ms;
+        }
+        sort($latencies);
+
+        $tail = array_slice($samples, -self::QUARANTINE_AFTER);
+        $failing = count($tail) >= self::QUARANTINE_AFTER;
+        foreach ($tail as $sample) {
+            if ($sample[1]) {
+                $failing = false;
+            }
+        }
+
+        $success_rate = $n ? $successes / $n : 0;
+        $p50 = $n ? $latencies[intdiv($n - 1, 2)] : null;
+
+        if ($failing) {
+            $state = 'quarantined';
+        } elseif ($success_rate < self::DEGRADED_SUCCESS || $p50 > self::DEGRADED_LATENCY_MS) {
+            $state = 'degraded';
+        } else {
+            $state = 'ok';
+        }
+
+        return [
+            'state' => $state,
+            'samples' => $n,
+            'success_rate' => round($success_rate, 2),
+            'avg_yield' => $n ? round($yield / $n, 1) : 0,
+            'p50_ms' => $p50,
+            'last_probe' => $n ? $samples[$n - 1][0] : null
+        ];
+    }
+
+    /** engine => method => summary */
+    public static function states() {
+        $states = [];
+        if (!class_exists('APCUIterator')) {
+            return $states;
+        }
+        foreach (new APCUIterator('/^' . self::PREFIX . '/') as $entry) {
+            [$engine, $method] = explode(':', substr($entry['key'], strlen(self::PREFIX)), 2);
+            $states[$engine][$method] = self::summarize($entry['value']);
+        }
+        ksort($states);
+        return $states;
+    }
+}
@@ -0,0 +1,51 @@
+<?php
+/**
+ * Response trimming for the client's degradation level (payload 'degrade', see fourget_load_governor.py).
+ * Applied to the response only; cached windows keep full data.
+ *   1 - drop related searches and answers
+ *   2 - cap every result list, strip web table/sitelink data
+ *   3 - primary result types only; harness.php also stops after one upstream fetch
+ */
+class degrade {
+    const MAX_ITEMS = 10;
+
+    const PRIMARY_TYPES = [
+        'web' => ['web'],
+        'image' => ['image'],
+        'video' => ['video', 'livestream', 'reel'],
+        'news' => ['news'],
+        'music' => ['song', 'podcast', 'playlist', 'album', 'author', 'user'],
+    ];
+
+    const KEEP_ALWAYS = ['status', 'npt', 'spelling'];
+
+    public static function apply($result, $method, $level) {
+        if ($level <= 0 || !is_array($result)) {
+            return $result;
+        }
+
+        unset($result['related'], $result['answer']);
+
+        if ($level >= 3 && isset(self::PRIMARY_TYPES[$method])) {
+            $keep = array_merge(self::PRIMARY_TYPES[$method], self::KEEP_ALWAYS);
+            $result = array_intersect_key($result, array_flip($keep));
+        }
+
+        if ($level >= 2) {
+            foreach ($result as $key => $items) {
+                if (!is_array($items) || !array_is_list($items)) {
+                    continue;
+                }
+                $items = array_slice($items, 0, self::MAX_ITEMS);
+                if ($key === 'web') {
+                    foreach ($items as $i => $item) {
+                        unset($items[$i]['table'], $items[$i]['sublink']);
+                    }
+                }
+                $result[$key] = $items;
+            }
+        }
+
+        return $result;
+    }
+}
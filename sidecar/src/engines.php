@@ -0,0 +1,62 @@
+<?php
+/**
+ * Engine spec for the client: engine => {methods, categories, paging, time_range}.
+ *
+ * Built from manifest.json (methods, paging) and filters.json (time range
+ * support = a newer/older filter on any page). 4get_engines.py turns it into
+ * settings.yml blocks; the engine module reads paging/time_range at init.
+ */
+ob_start();
+
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+header('Content-Type: application/json');
+
+const CATEGORIES = ['web' => 'general', 'image' => 'images', 'video' => 'videos', 'news' => 'news', 'music' => 'music'];
+
+try {
+    $spec = apcu_fetch('hijacker_engine_spec');
+    if ($spec === false) {
+        $manifest = apcu_fetch('hijacker_manifest');
+        if ($manifest === false) {
+            if (!file_exists(__DIR__ . '/manifest.json')) {
+                throw new Exception('Manifest not found');
+            }
+            $manifest = json_decode(file_get_contents(__DIR__ . '/manifest.json'), true);
+            apcu_store('hijacker_manifest', $manifest, 0);
+        }
+
+        $catalog = apcu_fetch('hijacker_filters');
+        if ($catalog === false && file_exists(__DIR__ . '/filters.json')) {
+            $catalog = json_decode(file_get_contents(__DIR__ . '/filters.json'), true);
+            apcu_store('hijacker_filters', $catalog, 0);
+        }
+
+        $spec = [];
+        foreach ($manifest as $engine => $engine_config) {
+            $methods = $engine_config['methods'] ?? array_keys(CATEGORIES);
+            $time_range = false;
+            foreach (($catalog[$engine] ?? []) as $filters) {
+                if (isset($filters['newer']) || isset($filters['older'])) {
+                    $time_range = true;
+                    break;
+                }
+            }
+            $spec[$engine] = [
+                'methods' => $methods,
+                'categories' => array_values(array_intersect_key(CATEGORIES, array_flip($methods))),
+                'paging' => $engine_config['paging'] ?? true,
+                'time_range' => $time_range,
+            ];
+        }
+        apcu_store('hijacker_engine_spec', $spec, 0);
+    }
+
+    ob_end_clean();
+    echo json_encode($spec, JSON_UNESCAPED_SLASHES);
+
+} catch (Throwable $e) {
+    ob_end_clean();
+    error_log("engines.php Error: " . $e->getMessage());
+    echo json_encode([]);
+}
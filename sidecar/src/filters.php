@@ -10,7 +10,24 @@ try {
 
     set_include_path(__DIR__ . '/dummy_lib' . PATH_SEPARATOR . __DIR__ . '/4get-repo' . PATH_SEPARATOR . get_include_path());
 
+    $catalog = apcu_fetch('hijacker_filters');
+    if ($catalog === false && file_exists(__DIR__ . '/filters.json')) {
+        $catalog = json_decode(file_get_contents(__DIR__ . '/filters.json'), true);
+        apcu_store('hijacker_filters', $catalog, 0);
+    }
+
     $raw_input = file_get_contents('php://input');
+
+    // No payload: hand out the whole catalog (engine => page => filters)
+    if ($raw_input === '' || $raw_input === false) {
+        if (!is_array($catalog)) {
+            throw new Exception('Filter catalog not built');
+        }
+        ob_end_clean();
+        echo json_encode($catalog, JSON_UNESCAPED_SLASHES);
+        exit;
+    }
+
     $input = json_decode($raw_input, true);
 
     if (!$input) {
@@ -20,7 +37,14 @@ try {
     $engine_input = str_replace('-', '_', $input['engine'] ?? '');
     $engine = preg_replace('/[^a-z0-9_]/', '', $engine_input);
     $page = $input['page'] ?? 'web';
-    
+
+    if (is_array($catalog) && isset($catalog[$engine])) {
+        ob_end_clean();
+        echo json_encode($catalog[$engine][$page] ?? []);
+        exit;
+    }
+
+    // Engine missing from catalog (build failed for it): live lookup
     $manifestPath = __DIR__ . '/manifest.json';
     
     $manifest = apcu_fetch('hijacker_manifest');
@@ -65,6 +89,6 @@ try {
 
 } catch (Throwable $e) {
     ob_end_clean();
-    error_log("Filters.php Error for engine '$engine': " . $e->getMessage());
+    error_log("Filters.php Error for engine '" . ($engine ?? '') . "': " . $e->getMessage());
     echo json_encode([]); 
 }
\ No newline at end of file
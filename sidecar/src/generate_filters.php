@@ -0,0 +1,58 @@
+<?php
+/**
+ * Builds filters.json: getfilters() output for every manifest engine and page,
+ * so filters.php never has to instantiate a scraper at request time.
+ */
+
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+
+$root = __DIR__;
+$manifestPath = $root . "/manifest.json";
+$catalogPath = $root . "/filters.json";
+$pages = ['web', 'images', 'videos', 'news', 'music'];
+
+if (!file_exists($manifestPath)) {
+    echo "Error: manifest.json not found, run generate_manifest.php first\n";
+    exit(1);
+}
+
+require_once $root . '/mock.php';
+set_include_path($root . '/dummy_lib' . PATH_SEPARATOR . $root . '/4get-repo' . PATH_SEPARATOR . get_include_path());
+
+$manifest = json_decode(file_get_contents($manifestPath), true);
+chdir($root . '/4get-repo');
+
+$catalog = [];
+foreach ($manifest as $engine => $engine_config) {
+    try {
+        require_once $engine_config['file'];
+        $className = $engine_config['class'];
+        if (!class_exists($className)) {
+            throw new Exception("Class '$className' not found");
+        }
+
+        $instance = new $className();
+        $catalog[$engine] = [];
+        foreach ($pages as $page) {
+            if (method_exists($instance, 'getfilters')) {
+                $filters = $instance->getfilters($page);
+            } else {
+                $filters = $instance->filter ?? [];
+            }
+            if (!empty($filters)) {
+                $catalog[$engine][$page] = $filters;
+            }
+        }
+    } catch (Throwable $e) {
+        echo "Warning: filters for '$engine' unavailable: " . $e->getMessage() . "\n";
+    }
+}
+
+$json = json_encode($catalog, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES);
+if (file_put_contents($catalogPath, $json)) {
+    echo "Filter catalog generated for " . count($catalog) . " engines.\n";
+} else {
+    echo "Error: Failed to write filters.json to $catalogPath\n";
+    exit(1);
+}
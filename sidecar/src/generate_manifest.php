@@ -1,6 +1,11 @@
 <?php
 /**
  * Synchronizes sidecar manifest.json with 4get scrapers
+ *
+ * Besides file/class, each entry records the scraper's search methods
+ * (web/image/video/news/music) and whether it issues pagination tokens,
+ * read from the source so no scraper has to be loaded. engines.php turns
+ * this into the client's engine spec.
  */
 
 $root = __DIR__; // Expecting app root (/var/www/html inside container)
@@ -24,9 +29,13 @@ foreach (glob("$scraperDir/*.php") as $path) {
     }
 
     $name = basename($path, ".php");
+    $source = file_get_contents($path);
+    preg_match_all('/public\s+function\s+(web|image|video|news|music)\s*\(/', $source, $m);
     $scrapers[$name] = [
         "file" => "scraper/" . basename($path),
-        "class" => $name
+        "class" => $name,
+        "methods" => array_values(array_unique($m[1])),
+        "paging" => strpos($source, 'backend->store(') !== false
     ];
 }
 
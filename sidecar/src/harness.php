@@ -8,6 +8,13 @@ ini_set('log_errors', 1);
 header('Content-Type: application/json');
 
 require_once 'mock.php';
+require_once __DIR__ . '/window.php';
+require_once __DIR__ . '/telemetry.php';
+require_once __DIR__ . '/bulkhead.php';
+require_once __DIR__ . '/degrade.php';
+require_once __DIR__ . '/popular.php';
+
+$started = microtime(true);
 
 set_include_path(__DIR__ . '/dummy_lib' . PATH_SEPARATOR . __DIR__ . '/4get-repo' . PATH_SEPARATOR . get_include_path());
 
@@ -21,14 +28,30 @@ if (!$input) {
     exit;
 }
 
+// Join the client's trace (sampled requests only, FOURGET_OTLP_ENDPOINT set)
+if (trace::start($input['trace'] ?? ($_SERVER['HTTP_TRACEPARENT'] ?? null), $_SERVER['REQUEST_TIME_FLOAT'] ?? $started)) {
+    trace::add('php.startup', $_SERVER['REQUEST_TIME_FLOAT'] ?? $started, $started);
+}
+
+// Absolute epoch deadline from the client (SearXNG engine timeout); past it nobody is waiting
+$deadline = isset($input['deadline']) ? (float)$input['deadline'] : null;
+if ($deadline !== null && microtime(true) >= $deadline) {
+    ob_end_clean();
+    echo json_encode(['status' => 'error', 'code' => 'deadline', 'message' => 'Deadline exceeded before scrape started']);
+    exit;
+}
+
 $engine_input = str_replace('-', '_', $input['engine'] ?? '');
 $engine = preg_replace('/[^a-z0-9_]/', '', $engine_input);
 
+$span = trace::begin('manifest.load');
 $manifest = apcu_fetch('hijacker_manifest');
+$manifest_cached = $manifest !== false;
 if ($manifest === false) {
     $manifest = json_decode(file_get_contents(__DIR__ . '/manifest.json'), true);
     apcu_store('hijacker_manifest', $manifest, 0);
 }
+trace::end($span, ['fourget.cached' => $manifest_cached]);
 
 if (!isset($manifest[$engine])) {
     ob_end_clean();
@@ -37,25 +60,15 @@ if (!isset($manifest[$engine])) {
 }
 
 $engine_config = $manifest[$engine];
-
-chdir(__DIR__ . '/4get-repo');
-
-if (!file_exists($engine_config['file'])) {
-    ob_end_clean();
-    echo json_encode(['status' => 'error', 'message' => "File not found: " . $engine_config['file']]);
-    exit;
+$method = preg_replace('/[^a-z_]/', '', $input['category'] ?? 'web') ?: 'web';
+$probe = !empty($input['probe']);
+if ($probe) {
+    require_once __DIR__ . '/canary.php';
 }
-
-require_once $engine_config['file'];
-
-$className = $engine_config['class'];
-if (!class_exists($className)) {
-    ob_end_clean();
-    echo json_encode(['status' => 'error', 'message' => "Class $className not found"]);
-    exit;
-}
-
-$instance = new $className();
+$warm = !empty($input['warm']); // warmer.php refilling a popular query: always scrape, always keep a window
+telemetry::start($engine, $method, $probe ? 'probe' : ($warm ? 'warm' : 'search'));
+trace::set('fourget.engine', $engine);
+trace::set('fourget.method', $method);
 
 $defaults = [
     's' => '', 
@@ -85,52 +98,244 @@ $defaults = [
 $input_params = $input['params'] ?? [];
 $params = $input_params + $defaults;
 
+$query = $params['s'] ?? '';
+$offset = (int)($params['offset'] ?? 0);
+$limit = max(1, (int)($input['limit'] ?? 10));
+$degrade = (int)($input['degrade'] ?? 0);
+
 backend::$context = [
     'engine' => $engine,
-    's' => $params['s'] ?? '',
-    'offset' => $params['offset'] ?? 0
+    's' => $query,
+    'deadline' => $deadline
 ];
 
-if (($params['offset'] ?? 0) > 0 && empty($params['npt'])) {
-    $det_key = md5($engine . ($params['s'] ?? '') . $params['offset']);
-    $stored_token = apcu_fetch("4get_det_$det_key");
-    
-    if ($stored_token) {
+$window_key = window::key($engine, $method, $input_params);
+if (!$probe && !$warm && empty($params['npt'])) {
+    popular::record($engine, $method, $window_key, $input_params, $offset, $limit);
+}
+
+// 1. Page already inside a cached result window: answer without loading the scraper
+$win = empty($params['npt']) && !$warm ? window::fetch($window_key) : false;
+if ($win !== false && window::covers($win, $offset, $limit)) {
+    $result = window::slice($win, $method, $offset, $limit);
+    telemetry::outcome('window_hit', count($result[window::primary($method)]));
+    ob_end_clean();
+    $span = trace::begin('encode');
+    echo json_encode(degrade::apply($result, $method, $degrade));
+    trace::end($span);
+    exit;
+}
+
+// 1b. First page of a tab whose items came along with a recent web scrape (carousel harvest).
+//     Served when it fills the page, or whatever it has while the client is degrading for load.
+if ($offset === 0 && empty($params['npt']) && $method !== 'web' && !$warm) {
+    $harvested = window::harvested($engine, $method, $input_params);
+    if ($harvested !== false && (count($harvested) >= $limit || ($degrade >= 1 && count($harvested) > 0))) {
+        $result = [window::primary($method) => array_slice($harvested, 0, $limit), 'npt' => null];
+        telemetry::outcome('harvest_hit', count($result[window::primary($method)]));
+        ob_end_clean();
+        $span = trace::begin('encode');
+        echo json_encode(degrade::apply($result, $method, $degrade));
+        trace::end($span);
+        exit;
+    }
+}
+
+// 2. Pick the upstream batch to fetch: continue the window, or resolve a pagination token
+$base = $offset;
+$max_fetches = $degrade >= 3 ? 1 : window::MAX_FETCHES;
+$walk_until = null;
+$walk_from = null;
+if ($win !== false && $offset >= $win['base'] && !empty($win['npt'])) {
+    $params['npt'] = $win['npt'];
+    $size = window::page_size($engine, $method) ?? $limit;
+    $walk_from = $win['base'] + count($win['items']); // the window's npt fetches the batch after its end
+} elseif ($offset > 0 && empty($params['npt'])) {
+    $win = false;
+    $size = window::page_size($engine, $method) ?? $limit;
+
+    // Tokens sit at the running totals batches really started at: fetch from the nearest one
+    [$base, $stored_token] = window::closest_token($engine, $method, $input_params, $offset);
+
+    // No stored start and an offset inside the first upstream batch: that batch needs no token
+    if ($base > 0 || $offset >= $size) {
+        telemetry::token_lookup('det', window::hops($base, $offset, $limit, $size) === 0);
+        $walk_from = $base;
         $params['npt'] = $stored_token;
-    } else {
+    }
+} else {
+    $win = false;
+}
+
+$hops = $walk_from !== null ? window::hops($walk_from, $offset, $limit, $size) : 0;
+if ($hops > 0) {
+    // Jumped past the known pages: walk the npt chain from the window's end or the closest cached batch
+    $max_depth = (int)(getenv('FOURGET_WALK_MAX_DEPTH') ?: window::WALK_MAX_DEPTH);
+    if ($degrade >= 3 || $hops > $max_depth) {
+        telemetry::outcome('token_miss');
         ob_end_clean();
         exit('[]');
     }
+    $max_fetches = $max_depth;
+    $walk_until = $started + (int)(getenv('FOURGET_WALK_BUDGET_MS') ?: window::WALK_BUDGET_MS) / 1000;
+    if ($deadline !== null) {
+        $walk_until = min($walk_until, $deadline);
+    }
 }
 
-try {
-    $method = $input['category'] ?? 'web';
+// 3. Bulkhead: a slow engine may only hold its own share of workers, and bulk callers only the unreserved part of it
+$lane = bulkhead::lane($input['priority'] ?? 'interactive');
+$span = trace::begin('bulkhead.wait', ['fourget.lane' => $lane]);
+$admitted = bulkhead::enter($engine, upstream::remaining_ms(), $lane);
+trace::end($span, ['fourget.admitted' => $admitted]);
+if (!$admitted) {
+    telemetry::outcome('overloaded');
+    ob_end_clean();
+    echo json_encode([
+        'status' => 'error',
+        'code' => 'overloaded',
+        'message' => "Engine $engine overloaded",
+        'retry_after' => bulkhead::RETRY_AFTER
+    ]);
+    exit;
+}
+
+chdir(__DIR__ . '/4get-repo');
+
+$span = trace::begin('scraper.load', ['code.filepath' => $engine_config['file']]);
+if (!file_exists($engine_config['file'])) {
+    ob_end_clean();
+    echo json_encode(['status' => 'error', 'message' => "File not found: " . $engine_config['file']]);
+    exit;
+}
+
+require_once $engine_config['file'];
 
+$className = $engine_config['class'];
+if (!class_exists($className)) {
+    ob_end_clean();
+    echo json_encode(['status' => 'error', 'message' => "Class $className not found"]);
+    exit;
+}
+
+$instance = new $className();
+trace::end($span);
+
+try {
     if (!method_exists($instance, $method)) {
         throw new Exception("Method '$method' not supported by engine '$engine'");
     }
 
-    $result = $instance->$method($params);
+    $primary = window::primary($method);
+    $fetches = 0;
+    do {
+        if ($deadline !== null && microtime(true) >= $deadline) {
+            if ($fetches === 0) {
+                throw new Exception("Deadline exceeded before scrape started");
+            }
+            break; // serve what the window has so far
+        }
+        if ($walk_until !== null && $fetches > 0 && microtime(true) >= $walk_until) {
+            break; // walk budget spent; the hops so far stay cached for the next try
+        }
+
+        $span = trace::begin('scrape', ['fourget.fetch' => $fetches + 1, 'fourget.token' => !empty($params['npt'])]);
+        $result = $instance->$method($params);
+        trace::end($span);
+        $fetches++;
+
+        if (!isset($result['npt']) && isset($instance->npt)) {
+            $result['npt'] = $instance->npt;
+        }
+
+        $batch = is_array($result[$primary] ?? null) ? count($result[$primary]) : 0;
+        window::learn($engine, $method, $batch);
+
+        if ($win === false) {
+            if ($batch <= $limit && $base === $offset && !$warm) {
+                break; // fits one page: plain passthrough
+            }
+            $win = window::from_result($result, $method, $base);
+        } else {
+            window::append($win, $result, $method);
+        }
+        window::remember_token($engine, $method, $input_params, $win['base'] + count($win['items']), $win['npt']);
+        $params['npt'] = $win['npt'];
+    } while (!window::covers($win, $offset, $limit) && $fetches < $max_fetches);
+
+    if ($walk_until !== null) {
+        telemetry::walk($engine, $method, $fetches);
+    }
+
+    if ($win !== false) {
+        window::store($window_key, $win);
+        $result = window::slice($win, $method, $offset, $limit);
+    } else {
+        window::remember_token($engine, $method, $input_params, $offset + $limit, $result['npt'] ?? null);
+    }
 
-    $resultCount = 0;
-    if (isset($result[$method]) && is_array($result[$method])) {
-        $resultCount = count($result[$method]);
-    } elseif (isset($result['web']) && $method === 'web') {
-        $resultCount = count($result['web']);
+    if ($method === 'web' && $offset === 0) {
+        window::harvest($engine, $input_params, $result);
     }
-    
+
+    $resultCount = is_array($result[$primary] ?? null) ? count($result[$primary]) : 0;
+
     if ($resultCount === 0) {
         error_log("Hijacker: Scraper '{$engine}' method '{$method}' returned 0 results.");
     }
+    telemetry::outcome($resultCount > 0 ? 'ok' : 'empty', $resultCount);
 
-    if (!isset($result['npt']) && isset($instance->npt)) {
-        $result['npt'] = $instance->npt;
+    if ($probe) {
+        canary::record($engine, $method, true, $resultCount, (microtime(true) - $started) * 1000);
     }
 
     ob_end_clean();
-    echo json_encode($result);
+    $span = trace::begin('encode');
+    echo json_encode(degrade::apply($result, $method, $degrade));
+    trace::end($span);
 } catch (Throwable $e) {
     ob_end_clean();
     error_log("Hijacker Error: " . $e->getMessage());
+    trace::set('exception.message', $e->getMessage());
+    if ($probe) {
+        canary::record($engine, $method, false, 0, (microtime(true) - $started) * 1000);
+    }
+
+    // Blocked: this identity's cookies are burnt, start the next scrape with a fresh jar
+    [$challenged_url, $challenged_proxy] = upstream::last_request();
+    if ($challenged_url !== null && jar::is_block($e->getMessage())) {
+        jar::rotate($engine, $challenged_proxy);
+    }
+
+    // Captcha/PoW/block page: hand the URL to the solver once instead of sitting out a suspension
+    if (solver::enabled() && $challenged_url !== null && solver::is_challenge($e->getMessage())) {
+        $clearance = solver::clearance($engine, $challenged_proxy);
+        if ($clearance !== false && $clearance['solved'] < $started) {
+            solver::invalidate($engine, $challenged_proxy); // it was sent and still got challenged
+        }
+
+        $reply = json_encode([
+            'status' => 'error',
+            'code' => 'challenge',
+            'message' => $e->getMessage(),
+            'retry_after' => solver::RETRY_AFTER
+        ]);
+        if (solver::claim($engine, $challenged_proxy)) {
+            telemetry::outcome('challenge');
+            trace::finish();
+            telemetry::finish();
+            telemetry::$request = null;
+            bulkhead::release_all();
+            solver::respond_then_solve($reply, $engine, $challenged_proxy, $challenged_url);
+            exit;
+        }
+        if (solver::solving($engine, $challenged_proxy)) {
+            telemetry::outcome('challenge');
+            echo $reply;
+            exit;
+        }
+    }
+
+    telemetry::outcome('exception');
     echo json_encode(['status' => 'error', 'message' => $e->getMessage()]);
-}
\ No newline at end of file
+}
@@ -42,5 +42,51 @@ if (function_exists('apcu_sma_info')) {
     ];
 }
 
+// 5. Upstream connection reuse within a request, DNS cache hits (populated by upstream.php)
+if (function_exists('apcu_enabled') && apcu_enabled()) {
+    require_once __DIR__ . '/upstream.php';
+    $health['upstream'] = [
+        'engines' => upstream::stats()
+    ];
+}
+
+// 6. Canary probe states per engine/method (populated by prober.php via harness.php)
+if (function_exists('apcu_enabled') && apcu_enabled()) {
+    require_once __DIR__ . '/canary.php';
+    $health['engines'] = canary::states();
+}
+
+// 7. Per-engine bulkheads: in-flight scrapes, queue depth, rejections
+if (function_exists('apcu_enabled') && apcu_enabled()) {
+    require_once __DIR__ . '/bulkhead.php';
+    $health['bulkheads'] = bulkhead::stats();
+}
+
+// 8. Challenge solver: engines with cached clearance (count of proxies)
+if (function_exists('apcu_enabled') && apcu_enabled()) {
+    require_once __DIR__ . '/solver.php';
+    $health['solver'] = [
+        'enabled' => solver::enabled(),
+        'clearance' => solver::stats()
+    ];
+}
+
+// 9. Cookie jars per engine (jars = proxies with a jar, cookies across them)
+if (function_exists('apcu_enabled') && apcu_enabled()) {
+    require_once __DIR__ . '/jar.php';
+    $health['cookie_jars'] = jar::stats();
+}
+
+// 10. Startup warm-up (warmup.php): not ready until it finished or ran out of time
+$warmup_file = getenv('FOURGET_WARMUP_STATE') ?: '/tmp/4get-warmup.json';
+$warmup = is_readable($warmup_file) ? json_decode(file_get_contents($warmup_file), true) : null;
+if (is_array($warmup)) {
+    $health['warmup'] = $warmup;
+    // The grace period covers a warm-up process that died without writing its final state
+    if ($warmup['state'] === 'warming' && time() < ($warmup['deadline'] ?? 0) + 30 && $health['status'] === 'ok') {
+        $health['status'] = 'warming';
+    }
+}
+
 http_response_code($health['status'] === 'ok' ? 200 : 503);
 echo json_encode($health, JSON_PRETTY_PRINT);
@@ -0,0 +1,105 @@
+<?php
+/**
+ * Cookie jars per (engine, proxy) kept in APCu, so scrapers come back like a
+ * returning browser instead of hitting consent pages and first-visit checks
+ * every request.
+ *
+ * upstream::attach() turns on curl's cookie engine and loads the jar into each
+ * scraper handle; upstream::record() harvests CURLINFO_COOKIELIST back into it.
+ * Jars are bounded (MAX_COOKIES / MAX_BYTES, oldest dropped first), expire after
+ * FOURGET_COOKIE_TTL seconds (default 3600) without use, and are thrown away when
+ * the engine reports a block. FOURGET_COOKIE_JARS=0 disables them.
+ */
+class jar {
+    const PREFIX = '4get_jar_';
+    const DEFAULT_TTL = 3600;
+    const MAX_COOKIES = 50;
+    const MAX_BYTES = 16384;
+    const BLOCK_RE = '/captcha|pow|challenge|blocked|forbidden|403|429|too many requests/i';
+
+    private static $rotated = [];
+
+    public static function enabled() {
+        $value = getenv('FOURGET_COOKIE_JARS');
+        return $value === false || !in_array(strtolower($value), ['', '0', 'false', 'no'], true);
+    }
+
+    /** Enable curl's cookie engine on $curl and seed it with the stored jar. Returns cookies loaded. */
+    public static function load($curl, $engine, $proxy) {
+        curl_setopt($curl, CURLOPT_COOKIEFILE, '');
+        $cookies = apcu_fetch(self::key($engine, $proxy));
+        if ($cookies === false) {
+            return 0;
+        }
+        foreach ($cookies as $line) {
+            curl_setopt($curl, CURLOPT_COOKIELIST, $line);
+        }
+        return count($cookies);
+    }
+
+    /** Merge the cookies an executed handle ended up with back into the jar. */
+    public static function save($curl, $engine, $proxy) {
+        $key = self::key($engine, $proxy);
+        if (isset(self::$rotated[$key])) {
+            return;
+        }
+        $lines = curl_getinfo($curl, CURLINFO_COOKIELIST);
+        if (empty($lines)) {
+            return;
+        }
+
+        $jar = apcu_fetch($key) ?: [];
+        $now = time();
+        foreach ($lines as $line) {
+            // Netscape format: domain, subdomains, path, secure, expires, name, value
+            $fields = explode("\t", $line);
+            if (count($fields) < 7) {
+                continue;
+            }
+            $id = $fields[0] . '|' . $fields[2] . '|' . $fields[5];
+            unset($jar[$id]); // re-insert so the freshest cookies survive trimming
+            $expires = (int)$fields[4];
+            if ($expires === 0 || $expires > $now) {
+                $jar[$id] = $line;
+            }
+        }
+
+        while (count($jar) > self::MAX_COOKIES || strlen(implode("\n", $jar)) > self::MAX_BYTES) {
+            array_shift($jar);
+        }
+        apcu_store($key, $jar, (int)(getenv('FOURGET_COOKIE_TTL') ?: self::DEFAULT_TTL));
+    }
+
+    /** Drop the jar after a block; cookies harvested later in this request are not saved either. */
+    public static function rotate($engine, $proxy) {
+        $key = self::key($engine, $proxy);
+        apcu_delete($key);
+        self::$rotated[$key] = true;
+    }
+
+    public static function is_block($message) {
+        return (bool)preg_match(self::BLOCK_RE, (string)$message);
+    }
+
+    /** engine => [jars, cookies] for health.php */
+    public static function stats() {
+        $stats = [];
+        if (!class_exists('APCUIterator')) {
+            return $stats;
+        }
+        foreach (new APCUIterator('/^' . self::PREFIX . '/') as $entry) {
+            if (!preg_match('/^' . self::PREFIX . '(.+)_[0-9a-f]{32}$/', $entry['key'], $m)) {
+                continue;
+            }
+            $stats[$m[1]] = $stats[$m[1]] ?? ['jars' => 0, 'cookies' => 0];
+            $stats[$m[1]]['jars']++;
+            $stats[$m[1]]['cookies'] += count($entry['value']);
+        }
+        ksort($stats);
+        return $stats;
+    }
+
+    private static function key($engine, $proxy) {
+        return self::PREFIX . $engine . '_' . md5((string)$proxy);
+    }
+}
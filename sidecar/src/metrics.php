@@ -0,0 +1,64 @@
+<?php
+/**
+ * Prometheus scrape target (also reachable as /metrics, see entrypoint.sh).
+ */
+header('Content-Type: text/plain; version=0.0.4');
+
+require_once __DIR__ . '/telemetry.php';
+require_once __DIR__ . '/upstream.php';
+require_once __DIR__ . '/canary.php';
+require_once __DIR__ . '/bulkhead.php';
+
+echo telemetry::render();
+
+echo "# HELP fourget_upstream_requests_total Scraper upstream transfers\n";
+echo "# TYPE fourget_upstream_requests_total counter\n";
+echo "# HELP fourget_upstream_reused_total Upstream transfers on a connection an earlier transfer of the same request opened\n";
+echo "# TYPE fourget_upstream_reused_total counter\n";
+foreach (upstream::stats() as $engine => $s) {
+    echo 'fourget_upstream_requests_total{engine="' . $engine . '"} ' . ($s['requests'] ?? 0) . "\n";
+    echo 'fourget_upstream_reused_total{engine="' . $engine . '"} ' . ($s['reused'] ?? 0) . "\n";
+}
+
+echo "# HELP fourget_engine_state Canary state per engine/method (1 = current state)\n";
+echo "# TYPE fourget_engine_state gauge\n";
+foreach (canary::states() as $engine => $methods) {
+    foreach ($methods as $method => $summary) {
+        echo 'fourget_engine_state{engine="' . $engine . '",method="' . $method . '",state="' . $summary['state'] . '"} 1' . "\n";
+    }
+}
+
+$bulkheads = bulkhead::stats();
+$bulkhead_metrics = [
+    'limit' => ['fourget_bulkhead_limit', 'gauge', 'Configured concurrent scrapes per engine'],
+    'reserved' => ['fourget_bulkhead_reserved', 'gauge', 'Slots reserved for the interactive lane'],
+];
+foreach ($bulkhead_metrics as $field => [$metric, $type, $help]) {
+    echo "# HELP $metric $help\n";
+    echo "# TYPE $metric $type\n";
+    foreach ($bulkheads as $engine => $b) {
+        echo $metric . '{engine="' . $engine . '"} ' . $b[$field] . "\n";
+    }
+}
+$lane_metrics = [
+    'inflight' => ['fourget_bulkhead_inflight', 'gauge', 'Scrapes currently holding a bulkhead slot'],
+    'queued' => ['fourget_bulkhead_queued', 'gauge', 'Requests waiting for a bulkhead slot'],
+    'rejected' => ['fourget_bulkhead_rejected_total', 'counter', 'Requests rejected as overloaded'],
+];
+foreach ($lane_metrics as $field => [$metric, $type, $help]) {
+    echo "# HELP $metric $help\n";
+    echo "# TYPE $metric $type\n";
+    foreach ($bulkheads as $engine => $b) {
+        foreach ($b['lanes'] as $lane => $l) {
+            echo $metric . '{engine="' . $engine . '",lane="' . $lane . '"} ' . $l[$field] . "\n";
+        }
+    }
+}
+
+echo "# HELP fourget_apcu_memory_bytes APCu shared memory\n";
+echo "# TYPE fourget_apcu_memory_bytes gauge\n";
+if (function_exists('apcu_sma_info')) {
+    $sma = apcu_sma_info(true);
+    echo 'fourget_apcu_memory_bytes{kind="used"} ' . ($sma['seg_size'] * $sma['num_seg'] - $sma['avail_mem']) . "\n";
+    echo 'fourget_apcu_memory_bytes{kind="total"} ' . ($sma['seg_size'] * $sma['num_seg']) . "\n";
+}
@@ -1,6 +1,11 @@
 <?php
 require_once __DIR__ . '/4get-repo/lib/fuckhtml.php';
 require_once __DIR__ . '/4get-repo/data/config.php';
+require_once __DIR__ . '/upstream.php';
+require_once __DIR__ . '/solver.php';
+require_once __DIR__ . '/jar.php';
+require_once __DIR__ . '/telemetry.php';
+require_once __DIR__ . '/trace.php';
 
 class backend {
     public static $context = [];
@@ -27,6 +32,8 @@ class backend {
     }
 
     public function assign_proxy($curl, $proxy) {
+        upstream::attach($curl, $proxy);
+
         if ($proxy === '127.0.0.1' || empty($proxy)) {
             return;
         }
@@ -51,20 +58,13 @@ class backend {
         ];
         apcu_store("4get_$token", $data, 3600);
 
-        if (!empty(self::$context)) {
-            $ctx = self::$context;
-            $current_offset = $ctx['offset'] ?? 0;
-            $next_offset = $current_offset + 10; 
-            
-            $key = md5(($ctx['engine'] ?? '') . ($ctx['s'] ?? '') . $next_offset);
-            apcu_store("4get_det_$key", $token, 3600);
-        }
-
+        // offset -> token mapping (4get_det_*) is written by harness.php once the batch size is known
         return $token;
     }
 
     public function get($token, $type) {
         $data = apcu_fetch("4get_$token");
+        telemetry::token_lookup('npt', $data !== false);
         if ($data === false) {
             return [null, '127.0.0.1'];
         }
@@ -0,0 +1,125 @@
+<?php
+/**
+ * Rolling popularity of user queries per (engine, method), for cache warming.
+ *
+ * harness.php records each real request (not probes or warm-ups) under its result
+ * window key with an exponentially decayed hit count, so the ranking follows recent
+ * traffic. queries.php serves the top FOURGET_WARM_TOP entries per (engine, method)
+ * to warmer.php together with how long their result window has left to live, and
+ * takes the list warmer.php saved before a restart back in, so it isn't lost.
+ *
+ * FOURGET_WARM_TOP=0 (the default) turns both tracking and warming off: the list
+ * holds user queries, so it is opt-in.
+ */
+class popular {
+    const PREFIX = '4get_pop_';
+    const HALF_LIFE = 3600; // seconds for a hit to count half
+    const TRACK_FACTOR = 4; // entries tracked per (engine, method) = top * factor, so climbers aren't trimmed early
+    const MAX_PAGES = 3; // deepest page a warm-up fills
+
+    public static function top_n() {
+        return max(0, (int)getenv('FOURGET_WARM_TOP'));
+    }
+
+    /** Count a request for $params (offset/npt stripped) that asked for [offset, offset + limit). */
+    public static function record($engine, $method, $window_key, $params, $offset, $limit) {
+        $top = self::top_n();
+        if ($top === 0) {
+            return;
+        }
+        unset($params['offset'], $params['npt']);
+
+        $key = self::PREFIX . "$engine:$method";
+        $entries = apcu_fetch($key) ?: [];
+        $now = time();
+        $entry = $entries[$window_key] ?? ['params' => $params, 'hits' => 0.0, 'seen' => $now, 'pages' => 1];
+        $entry['hits'] = self::decayed($entry, $now) + 1;
+        $entry['seen'] = $now;
+        $entry['pages'] = min(self::MAX_PAGES, max($entry['pages'], intdiv($offset, $limit) + 1));
+        $entries[$window_key] = $entry;
+        self::save($key, $entries, $top, $now);
+    }
+
+    /** Merge a list top() returned at $seen back in (needs window.php); live entries keep the higher count. */
+    public static function seed($popular, $seen) {
+        $top = self::top_n();
+        if ($top === 0) {
+            return 0;
+        }
+        $now = time();
+        $seeded = 0;
+        foreach ($popular as $engine => $methods) {
+            foreach ($methods as $method => $saved) {
+                $key = self::PREFIX . "$engine:$method";
+                $entries = apcu_fetch($key) ?: [];
+                foreach ($saved as $e) {
+                    if (!isset($e['params'], $e['hits']) || !is_array($e['params'])) {
+                        continue;
+                    }
+                    $window_key = window::key($engine, $method, $e['params']);
+                    $entry = ['params' => $e['params'], 'hits' => (float)$e['hits'], 'seen' => $seen, 'pages' => (int)($e['pages'] ?? 1)];
+                    if (isset($entries[$window_key]) && self::decayed($entries[$window_key], $now) >= self::decayed($entry, $now)) {
+                        continue;
+                    }
+                    $entries[$window_key] = $entry;
+                    $seeded++;
+                }
+                self::save($key, $entries, $top, $now);
+            }
+        }
+        return $seeded;
+    }
+
+    /** engine => method => [[params, hits, pages, expires_in], ...] most popular first */
+    public static function top($min_hits = 0) {
+        $top = [];
+        $n = self::top_n();
+        if ($n === 0 || !class_exists('APCUIterator')) {
+            return $top;
+        }
+        $now = time();
+        foreach (new APCUIterator('/^' . self::PREFIX . '/') as $entry) {
+            [$engine, $method] = explode(':', substr($entry['key'], strlen(self::PREFIX)), 2);
+            foreach (array_slice(self::ranked($entry['value'], $now), 0, $n, true) as $window_key => $e) {
+                $hits = self::decayed($e, $now);
+                if ($hits < $min_hits) {
+                    break;
+                }
+                $top[$engine][$method][] = [
+                    'params' => $e['params'],
+                    'hits' => round($hits, 2),
+                    'pages' => $e['pages'],
+                    'expires_in' => self::expires_in($window_key, $now)
+                ];
+            }
+        }
+        ksort($top);
+        return $top;
+    }
+
+    private static function save($key, $entries, $top, $now) {
+        if (count($entries) > $top * self::TRACK_FACTOR) {
+            $entries = self::ranked($entries, $now);
+            $entries = array_slice($entries, 0, $top * self::TRACK_FACTOR, true);
+        }
+        apcu_store($key, $entries, 0);
+    }
+
+    private static function ranked($entries, $now) {
+        uasort($entries, fn($a, $b) => self::decayed($b, $now) <=> self::decayed($a, $now));
+        return $entries;
+    }
+
+    private static function decayed($entry, $now) {
+        return $entry['hits'] * 0.5 ** (($now - $entry['seen']) / self::HALF_LIFE);
+    }
+
+    /** Seconds until the cached window for $window_key expires, 0 if there is none. */
+    private static function expires_in($window_key, $now) {
+        $info = function_exists('apcu_key_info') ? apcu_key_info($window_key) : null;
+        if (empty($info)) {
+            return 0;
+        }
+        return max(0, $info['creation_time'] + $info['ttl'] - $now);
+    }
+}
@@ -0,0 +1,74 @@
+<?php
+/**
+ * Background canary prober (CLI, started by entrypoint.sh).
+ * Sends low-rate probe queries for every manifest engine/method through harness.php,
+ * which records the outcome via canary.php in Apache's APCu.
+ *
+ * FOURGET_PROBE_INTERVAL  seconds between probes of one engine/method (default 600, 0 = off)
+ * FOURGET_PROBE_QUERIES   comma separated canary queries (rotated)
+ */
+
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+
+$interval = (int)(getenv('FOURGET_PROBE_INTERVAL') !== false ? getenv('FOURGET_PROBE_INTERVAL') : 600);
+if ($interval <= 0) {
+    exit(0);
+}
+
+$queries = array_values(array_filter(array_map('trim', explode(',', getenv('FOURGET_PROBE_QUERIES') ?: 'weather,wikipedia,music'))));
+$methods = ['web', 'image', 'video', 'news', 'music'];
+$root = __DIR__;
+$harness = 'http://127.0.0.1/harness.php';
+
+require_once $root . '/mock.php';
+set_include_path($root . '/dummy_lib' . PATH_SEPARATOR . $root . '/4get-repo' . PATH_SEPARATOR . get_include_path());
+
+$manifest = json_decode(file_get_contents($root . '/manifest.json'), true) ?: [];
+chdir($root . '/4get-repo');
+
+// Work out which methods each scraper implements once, up front
+$targets = [];
+foreach ($manifest as $engine => $engine_config) {
+    try {
+        require_once $engine_config['file'];
+        foreach ($methods as $method) {
+            if (method_exists($engine_config['class'], $method)) {
+                $targets[] = [$engine, $method];
+            }
+        }
+    } catch (Throwable $e) {
+        error_log("Prober: skipping '$engine': " . $e->getMessage());
+    }
+}
+
+if (empty($targets) || empty($queries)) {
+    exit(0);
+}
+
+// Let Apache come up before the first round
+sleep(30);
+
+$pause = max(1, intdiv($interval, count($targets)));
+$round = 0;
+while (true) {
+    shuffle($targets);
+    foreach ($targets as [$engine, $method]) {
+        $payload = json_encode([
+            'engine' => $engine,
+            'category' => $method,
+            'probe' => true,
+            'params' => ['s' => $queries[$round % count($queries)]]
+        ]);
+        $context = stream_context_create(['http' => [
+            'method' => 'POST',
+            'header' => "Content-Type: application/json\r\n",
+            'content' => $payload,
+            'timeout' => 30,
+            'ignore_errors' => true
+        ]]);
+        @file_get_contents($harness, false, $context);
+        sleep($pause);
+    }
+    $round++;
+}
@@ -0,0 +1,30 @@
+<?php
+/**
+ * Popular queries for warmer.php: engine => method => [{params, hits, pages, expires_in}].
+ * POST {"seen": unix time, "popular": <that list>} seeds it with the list saved before
+ * a restart and answers {"seeded": n}.
+ *
+ * Holds user queries, so it only answers the local warmer.
+ */
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+header('Content-Type: application/json');
+
+if (!in_array($_SERVER['REMOTE_ADDR'] ?? '', ['127.0.0.1', '::1'], true)) {
+    http_response_code(403);
+    echo json_encode([]);
+    exit;
+}
+
+require_once __DIR__ . '/popular.php';
+
+if ($_SERVER['REQUEST_METHOD'] === 'POST') {
+    require_once __DIR__ . '/window.php';
+    $input = json_decode(file_get_contents('php://input'), true);
+    $seen = (int)($input['seen'] ?? time());
+    echo json_encode(['seeded' => is_array($input['popular'] ?? null) ? popular::seed($input['popular'], min($seen, time())) : 0]);
+    exit;
+}
+
+$min_hits = (float)($_GET['min_hits'] ?? 0);
+echo json_encode(popular::top($min_hits), JSON_UNESCAPED_SLASHES);
@@ -0,0 +1,213 @@
+<?php
+/**
+ * Challenge solving through a FlareSolverr-compatible service (FOURGET_SOLVER,
+ * e.g. http://flaresolverr:8191/v1; unset = off).
+ *
+ * When a scrape fails on a captcha/PoW/block page, harness.php answers the client
+ * with code "challenge" right away and then sends the challenged URL to the solver
+ * once per (engine, proxy). The clearance cookies and user agent it returns are
+ * kept in APCu and added to that engine's later requests through the same proxy
+ * by upstream::attach(), so the engine is back after one solve instead of a
+ * five minute suspension. A clearance that gets challenged again is dropped.
+ *
+ * Scrapers set their own header list (User-Agent, sometimes Cookie) before
+ * assign_proxy(), and curl gives those precedence over CURLOPT_USERAGENT/COOKIE.
+ * So clearance cookies go through the cookie engine, which is sent regardless,
+ * and the header list each scraper sent per (host, path) is learned from
+ * CURLINFO_HEADER_OUT so a cleared request can be rewritten with the solver's
+ * user agent and without the scraper's Cookie header.
+ */
+class solver {
+    const PREFIX = '4get_clear_';
+    const CLEARANCE_TTL = 1800; // upper bound; cookie expiry wins when sooner
+    const LOCK_TTL = 90; // one solve per (engine, proxy) at a time; a failed solve also waits this out
+    const MAX_TIMEOUT_MS = 60000;
+    const RETRY_AFTER = 20; // seconds the client should sit out while a solve runs
+    const CHALLENGE_RE = '/captcha|pow|challenge|blocked|forbidden|403/i';
+    const HEADERS_PREFIX = '4get_hdrs_';
+    const HEADERS_TTL = 86400;
+    // Never replayed from a learned list: curl derives them per transfer, or the clearance replaces them
+    const OWN_HEADERS = ['host', 'content-length', 'cookie', 'user-agent'];
+
+    public static function enabled() {
+        return (bool)getenv('FOURGET_SOLVER');
+    }
+
+    public static function is_challenge($message) {
+        return (bool)preg_match(self::CHALLENGE_RE, (string)$message);
+    }
+
+    public static function clearance($engine, $proxy) {
+        return apcu_fetch(self::key($engine, $proxy));
+    }
+
+    public static function invalidate($engine, $proxy) {
+        apcu_delete(self::key($engine, $proxy));
+    }
+
+    /** Add cached clearance to a scraper handle about to fetch $url. */
+    public static function apply($curl, $engine, $proxy, $url) {
+        $clearance = self::clearance($engine, $proxy);
+        $host = parse_url((string)$url, PHP_URL_HOST);
+        if ($clearance === false || empty($host)) {
+            return false;
+        }
+
+        $cookies = [];
+        foreach ($clearance['cookies'] as $cookie) {
+            $domain = ltrim($cookie['domain'] ?? '', '.');
+            if ($domain === '' || $host === $domain || substr($host, -strlen($domain) - 1) === ".$domain") {
+                // Netscape format: domain, subdomains, path, secure, expires, name, value
+                $cookies[] = implode("\t", [
+                    $domain === '' ? $host : '.' . $domain, $domain === '' ? 'FALSE' : 'TRUE', $cookie['path'] ?? '/',
+                    empty($cookie['secure']) ? 'FALSE' : 'TRUE', max(0, (int)($cookie['expires'] ?? 0)),
+                    $cookie['name'], $cookie['value']
+                ]);
+            }
+        }
+        if (empty($cookies)) {
+            return false;
+        }
+
+        curl_setopt($curl, CURLOPT_COOKIEFILE, '');
+        foreach ($cookies as $line) {
+            curl_setopt($curl, CURLOPT_COOKIELIST, $line);
+        }
+
+        $headers = apcu_fetch(self::headers_key($engine, $url));
+        if (!empty($clearance['ua'])) {
+            curl_setopt($curl, CURLOPT_USERAGENT, $clearance['ua']);
+            if ($headers !== false) {
+                $headers[] = 'User-Agent: ' . $clearance['ua'];
+            }
+        }
+        if ($headers !== false) {
+            curl_setopt($curl, CURLOPT_HTTPHEADER, $headers);
+        }
+        return true;
+    }
+
+    /** upstream::record(): keep the header list an executed scraper handle sent, for apply() to rewrite. */
+    public static function learn_headers($curl, $engine) {
+        $sent = curl_getinfo($curl, CURLINFO_HEADER_OUT);
+        if (!is_string($sent) || $sent === '') {
+            return;
+        }
+        $lines = preg_split('/\r?\n/', trim($sent));
+        array_shift($lines); // request line
+        $headers = [];
+        foreach ($lines as $line) {
+            $name = strtolower(trim(strstr($line, ':', true)));
+            if ($name !== '' && !in_array($name, self::OWN_HEADERS, true)) {
+                $headers[] = $line;
+            }
+        }
+        apcu_store(self::headers_key($engine, curl_getinfo($curl, CURLINFO_EFFECTIVE_URL)), $headers, self::HEADERS_TTL);
+    }
+
+    /** Take the solve for (engine, proxy); false when another worker has it or one failed recently. */
+    public static function claim($engine, $proxy) {
+        return apcu_add(self::key($engine, $proxy) . '_lock', getmypid(), self::LOCK_TTL);
+    }
+
+    /** A solve for (engine, proxy) is running right now (as opposed to having failed recently). */
+    public static function solving($engine, $proxy) {
+        $lock = apcu_fetch(self::key($engine, $proxy) . '_lock');
+        return $lock !== false && $lock !== 'failed';
+    }
+
+    /** Send $body to the client and close the connection, then solve in this worker. */
+    public static function respond_then_solve($body, $engine, $proxy, $url) {
+        ignore_user_abort(true);
+        set_time_limit((int)(self::MAX_TIMEOUT_MS / 1000) + 30);
+        header('Connection: close');
+        header('Content-Length: ' . strlen($body));
+        echo $body;
+        while (ob_get_level() > 0) {
+            ob_end_flush();
+        }
+        flush();
+
+        return self::solve($engine, $proxy, $url);
+    }
+
+    /** Run the solver for $url and cache the clearance. Returns true on success. */
+    public static function solve($engine, $proxy, $url) {
+        $request = ['cmd' => 'request.get', 'url' => $url, 'maxTimeout' => self::MAX_TIMEOUT_MS];
+        if ($proxy !== '127.0.0.1' && !empty($proxy)) {
+            $parts = explode(':', $proxy);
+            $request['proxy'] = ['url' => 'http://' . $parts[0] . ':' . $parts[1]];
+            if (isset($parts[2], $parts[3])) {
+                $request['proxy'] += ['username' => $parts[2], 'password' => $parts[3]];
+            }
+        }
+
+        $curl = curl_init(getenv('FOURGET_SOLVER'));
+        curl_setopt_array($curl, [
+            CURLOPT_POST => true,
+            CURLOPT_POSTFIELDS => json_encode($request),
+            CURLOPT_HTTPHEADER => ['Content-Type: application/json'],
+            CURLOPT_RETURNTRANSFER => true,
+            CURLOPT_TIMEOUT_MS => self::MAX_TIMEOUT_MS + 5000,
+        ]);
+        $body = curl_exec($curl);
+        curl_close($curl);
+
+        $reply = $body === false ? null : json_decode($body, true);
+        $solution = $reply['solution'] ?? null;
+        if (($reply['status'] ?? '') !== 'ok' || empty($solution['cookies'])) {
+            apcu_store(self::key($engine, $proxy) . '_lock', 'failed', self::LOCK_TTL);
+            error_log("Hijacker: solver failed for '$engine' ($url): " . ($reply['message'] ?? 'no reply'));
+            return false;
+        }
+
+        $ttl = self::CLEARANCE_TTL;
+        $cookies = [];
+        foreach ($solution['cookies'] as $cookie) {
+            if (!isset($cookie['name'], $cookie['value'])) {
+                continue;
+            }
+            $expires = (int)($cookie['expires'] ?? $cookie['expiry'] ?? 0);
+            $cookies[] = [
+                'name' => $cookie['name'], 'value' => $cookie['value'], 'domain' => $cookie['domain'] ?? '',
+                'path' => $cookie['path'] ?? '/', 'secure' => !empty($cookie['secure']), 'expires' => $expires
+            ];
+            if ($expires > 0) {
+                $ttl = min($ttl, $expires - time());
+            }
+        }
+        $ttl = max(60, $ttl);
+
+        apcu_store(self::key($engine, $proxy), [
+            'cookies' => $cookies,
+            'ua' => $solution['userAgent'] ?? null,
+            'solved' => time(),
+        ], $ttl);
+        apcu_delete(self::key($engine, $proxy) . '_lock');
+        error_log("Hijacker: solver cleared '$engine' (" . count($cookies) . " cookies, {$ttl}s)");
+        return true;
+    }
+
+    /** engine => number of proxies with a cached clearance, for health.php */
+    public static function stats() {
+        $stats = [];
+        if (!class_exists('APCUIterator')) {
+            return $stats;
+        }
+        foreach (new APCUIterator('/^' . self::PREFIX . '(.+)_[0-9a-f]{32}$/') as $entry) {
+            preg_match('/^' . self::PREFIX . '(.+)_[0-9a-f]{32}$/', $entry['key'], $m);
+            $stats[$m[1]] = ($stats[$m[1]] ?? 0) + 1;
+        }
+        ksort($stats);
+        return $stats;
+    }
+
+    private static function key($engine, $proxy) {
+        return self::PREFIX . $engine . '_' . md5((string)$proxy);
+    }
+
+    private static function headers_key($engine, $url) {
+        $parts = parse_url((string)$url) ?: [];
+        return self::HEADERS_PREFIX . $engine . '_' . md5(($parts['host'] ?? '') . ($parts['path'] ?? '/'));
+    }
+}
@@ -0,0 +1,172 @@
+<?php
+/**
+ * Request metrics kept as APCu counters, rendered in Prometheus text format by metrics.php.
+ *
+ * harness.php fills telemetry::$request as it goes; a shutdown hook records it, so
+ * every exit path (window hit, early error, exception) is counted exactly once.
+ * Keys: 4get_m_<name>|<label string>, values are integers (durations in microseconds).
+ */
+class telemetry {
+    const PREFIX = '4get_m_';
+    const DURATION_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 3, 5, 10];
+    const MEMORY_BUCKETS_MB = [4, 8, 16, 32, 64, 128, 256];
+    const QUEUE_WAIT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2];
+
+    const HELP = [
+        'fourget_requests_total' => ['counter', 'Harness requests by outcome'],
+        'fourget_scrape_duration_seconds' => ['histogram', 'Harness wall time per request, by outcome and caller'],
+        'fourget_results_total' => ['counter', 'Primary results returned'],
+        'fourget_empty_results_total' => ['counter', 'Requests that returned zero results'],
+        'fourget_exceptions_total' => ['counter', 'Scraper exceptions'],
+        'fourget_token_lookups_total' => ['counter', 'Pagination token store lookups'],
+        'fourget_window_hits_total' => ['counter', 'Pages served from a cached result window'],
+        'fourget_queue_wait_seconds' => ['histogram', 'Time spent waiting for a bulkhead slot, per priority lane'],
+        'fourget_npt_walk_hops_total' => ['counter', 'Upstream calls spent walking the npt chain to a deep page'],
+        'fourget_peak_memory_bytes' => ['histogram', 'PHP peak memory per request'],
+    ];
+
+    public static $request = null;
+
+    /** $caller: search (client traffic), probe (prober/warm-up canaries) or warm (warmer.php refills) */
+    public static function start($engine, $method, $caller = 'search') {
+        if (self::$request === null) {
+            register_shutdown_function([self::class, 'finish']);
+        }
+        self::$request = [
+            'engine' => $engine,
+            'method' => $method,
+            'caller' => $caller,
+            'started' => microtime(true),
+            'outcome' => 'error',
+            'results' => 0
+        ];
+    }
+
+    public static function outcome($outcome, $results = 0) {
+        if (self::$request !== null) {
+            self::$request['outcome'] = $outcome;
+            self::$request['results'] = $results;
+        }
+    }
+
+    public static function finish() {
+        $r = self::$request;
+        if ($r === null || !function_exists('apcu_inc')) {
+            return;
+        }
+        $labels = self::labels(['engine' => $r['engine'], 'method' => $r['method']]);
+
+        self::inc('fourget_requests_total', self::labels([
+            'engine' => $r['engine'], 'method' => $r['method'], 'outcome' => $r['outcome']
+        ]));
+        // Cache hits and rejections finish in microseconds: keep them apart from scrape latency
+        self::observe('fourget_scrape_duration_seconds', self::labels([
+            'engine' => $r['engine'], 'method' => $r['method'], 'outcome' => $r['outcome'], 'caller' => $r['caller']
+        ]), microtime(true) - $r['started'], self::DURATION_BUCKETS, 1000000);
+        self::observe('fourget_peak_memory_bytes', $labels, memory_get_peak_usage(true),
+            array_map(fn($mb) => $mb * 1048576, self::MEMORY_BUCKETS_MB), 1);
+
+        if ($r['results'] > 0) {
+            self::inc('fourget_results_total', $labels, $r['results']);
+        }
+        if ($r['outcome'] === 'empty') {
+            self::inc('fourget_empty_results_total', $labels);
+        } elseif ($r['outcome'] === 'exception') {
+            self::inc('fourget_exceptions_total', $labels);
+        } elseif ($r['outcome'] === 'window_hit') {
+            self::inc('fourget_window_hits_total', $labels);
+        }
+    }
+
+    /** $source: det (offset -> token) or npt (token -> upstream url) */
+    public static function token_lookup($source, $hit) {
+        self::inc('fourget_token_lookups_total', self::labels(['source' => $source, 'result' => $hit ? 'hit' : 'miss']));
+    }
+
+    /** Upstream calls one deep-page request made walking from the closest cached token */
+    public static function walk($engine, $method, $hops) {
+        self::inc('fourget_npt_walk_hops_total', self::labels(['engine' => $engine, 'method' => $method]), $hops);
+    }
+
+    /** Bulkhead queue wait (0 when a slot was free) per engine and priority lane */
+    public static function queue_wait($engine, $lane, $seconds) {
+        self::observe('fourget_queue_wait_seconds', self::labels(['engine' => $engine, 'lane' => $lane]), $seconds, self::QUEUE_WAIT_BUCKETS, 1000000);
+    }
+
+    public static function inc($name, $labels, $by = 1) {
+        if (!function_exists('apcu_inc')) {
+            return;
+        }
+        $key = self::PREFIX . $name . '|' . $labels;
+        apcu_add($key, 0, 0);
+        apcu_inc($key, (int)$by);
+    }
+
+    /** Histogram stored as per-bucket counts (made cumulative at render) plus _sum scaled by $unit. */
+    private static function observe($name, $labels, $value, $buckets, $unit) {
+        $le = '+Inf';
+        foreach ($buckets as $bound) {
+            if ($value <= $bound) {
+                $le = (string)$bound;
+                break;
+            }
+        }
+        $sep = $labels === '' ? '' : ',';
+        self::inc($name . '_bucket', $labels . $sep . 'le="' . $le . '"');
+        self::inc($name . '_sum', $labels, $value * $unit);
+        self::inc($name . '_count', $labels);
+    }
+
+    private static function labels($labels) {
+        $parts = [];
+        foreach ($labels as $k => $v) {
+            $parts[] = $k . '="' . addcslashes((string)$v, "\"\\\n") . '"';
+        }
+        return implode(',', $parts);
+    }
+
+    /** Prometheus text exposition of everything under PREFIX. */
+    public static function render() {
+        $series = [];
+        if (class_exists('APCUIterator')) {
+            foreach (new APCUIterator('/^' . self::PREFIX . '/') as $entry) {
+                [$name, $labels] = explode('|', substr($entry['key'], strlen(self::PREFIX)), 2);
+                $series[$name][$labels] = $entry['value'];
+            }
+        }
+
+        $out = [];
+        foreach (self::HELP as $metric => [$type, $help]) {
+            $out[] = "# HELP $metric $help";
+            $out[] = "# TYPE $metric $type";
+
+            if ($type !== 'histogram') {
+                foreach ($series[$metric] ?? [] as $labels => $value) {
+                    $out[] = $metric . '{' . $labels . '} ' . $value;
+                }
+                continue;
+            }
+
+            if ($metric === 'fourget_peak_memory_bytes') {
+                [$bounds, $scale] = [array_map(fn($mb) => $mb * 1048576, self::MEMORY_BUCKETS_MB), 1];
+            } else {
+                $bounds = $metric === 'fourget_queue_wait_seconds' ? self::QUEUE_WAIT_BUCKETS : self::DURATION_BUCKETS;
+                $scale = 1000000;
+            }
+            $bounds[] = '+Inf';
+
+            foreach ($series[$metric . '_count'] ?? [] as $labels => $count) {
+                $sep = $labels === '' ? '' : ',';
+                $cumulative = 0;
+                foreach ($bounds as $bound) {
+                    $cumulative += $series[$metric . '_bucket'][$labels . $sep . 'le="' . $bound . '"'] ?? 0;
+                    $out[] = $metric . '_bucket{' . $labels . $sep . 'le="' . $bound . '"} ' . $cumulative;
+                }
+                $out[] = $metric . '_sum{' . $labels . '} ' . (($series[$metric . '_sum'][$labels] ?? 0) / $scale);
+                $out[] = $metric . '_count{' . $labels . '} ' . $count;
+            }
+        }
+
+        return implode("\n", $out) . "\n";
+    }
+}
@@ -0,0 +1,247 @@
+<?php
+/**
+ * Sidecar spans for distributed traces started by the client (fourget_tracing.py).
+ *
+ * harness.php joins the trace named by the payload's "trace" (or the traceparent
+ * header) when it is sampled and FOURGET_OTLP_ENDPOINT is set. Spans: harness
+ * (server span), php.startup, manifest.load, bulkhead.wait, scraper.load, scrape,
+ * upstream.fetch (one per curl transfer, timings from curl_getinfo) and encode.
+ *
+ * Exporting inline would hold the client's connection open, so finished requests
+ * are buffered in APCu and traces.php posts them as OTLP/HTTP JSON; entrypoint.sh
+ * calls it every couple of seconds.
+ */
+class trace {
+    const PREFIX = '4get_trace_';
+    const TTL = 60; // buffered spans the exporter hasn't picked up by then are dropped
+    const MAX_BATCH = 200; // requests per export
+    const EXPORT_TIMEOUT_MS = 2000;
+    const TRACEPARENT_RE = '/^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/';
+
+    // OTLP span kinds
+    const INTERNAL = 1;
+    const SERVER = 2;
+
+    private static $context = null; // [trace_id, parent span, server span, started]
+    private static $spans = [];
+    private static $stack = [];
+    private static $fetches = []; // spl_object_id(curl) => [started, parent]
+    private static $attributes = [];
+
+    public static function enabled() {
+        return (bool)getenv('FOURGET_OTLP_ENDPOINT');
+    }
+
+    public static function active() {
+        return self::$context !== null;
+    }
+
+    /** Join the trace in $traceparent if it is sampled. $started is when PHP began the request. */
+    public static function start($traceparent, $started, $attributes = []) {
+        if (!self::enabled() || !preg_match(self::TRACEPARENT_RE, (string)$traceparent, $m) || !(hexdec($m[3]) & 1)) {
+            return false;
+        }
+        self::$context = [$m[1], $m[2], self::id(), $started];
+        self::$attributes = $attributes;
+        register_shutdown_function(function () {
+            // Queued behind upstream::record(), which reports the curl transfers
+            register_shutdown_function([self::class, 'finish']);
+        });
+        return true;
+    }
+
+    /** Open a span under the innermost open one; returns its handle for end(). */
+    public static function begin($name, $attributes = []) {
+        if (self::$context === null) {
+            return null;
+        }
+        $span = self::make($name, microtime(true), null, self::current(), $attributes);
+        self::$stack[] = $span;
+        return $span['id'];
+    }
+
+    public static function end($handle, $attributes = [], $error = null) {
+        if ($handle === null) {
+            return;
+        }
+        foreach (self::$stack as $i => $span) {
+            if ($span['id'] === $handle) {
+                $span['end'] = microtime(true);
+                $span['attributes'] += $attributes;
+                $span['error'] = $error;
+                self::$spans[] = $span;
+                array_splice(self::$stack, $i);
+                return;
+            }
+        }
+    }
+
+    /** Record a span whose bounds are already known. */
+    public static function add($name, $start, $end, $attributes = []) {
+        if (self::$context !== null) {
+            self::$spans[] = self::make($name, $start, $end, self::current(), $attributes);
+        }
+    }
+
+    public static function set($key, $value) {
+        self::$attributes[$key] = $value;
+    }
+
+    /** upstream::attach(): a transfer is about to run for the current span. */
+    public static function fetch_started($curl) {
+        self::$fetches[spl_object_id($curl)] = [microtime(true), self::current()];
+    }
+
+    /** upstream::record(): the transfer's curl timings become an upstream.fetch span. */
+    public static function fetch_done($curl, $info) {
+        [$started, $parent] = self::$fetches[spl_object_id($curl)] ?? [null, null];
+        if ($started === null) {
+            return;
+        }
+        $ms = fn($key) => isset($info[$key]) ? round($info[$key] * 1000, 2) : null;
+        self::$spans[] = self::make('upstream.fetch', $started, $started + $info['total_time'], $parent, [
+            'server.address' => parse_url((string)($info['url'] ?? ''), PHP_URL_HOST),
+            'http.response.status_code' => $info['http_code'] ?? null,
+            'fourget.dns_ms' => $ms('namelookup_time'),
+            'fourget.connect_ms' => $ms('connect_time'),
+            'fourget.tls_ms' => $ms('appconnect_time'),
+            'fourget.ttfb_ms' => $ms('starttransfer_time'),
+            'http.response.body.size' => isset($info['size_download']) ? (int)$info['size_download'] : null,
+        ]);
+    }
+
+    /** Close the server span and buffer the request's spans for traces.php. Idempotent. */
+    public static function finish() {
+        if (self::$context === null) {
+            return;
+        }
+        [$trace_id, $parent, $server, $started] = self::$context;
+        $now = microtime(true);
+        foreach (self::$stack as $span) {
+            $span['end'] = $now;
+            self::$spans[] = $span;
+        }
+        $attributes = self::$attributes;
+        if (class_exists('telemetry') && telemetry::$request !== null) {
+            $attributes['fourget.outcome'] = telemetry::$request['outcome'];
+            $attributes['fourget.results'] = telemetry::$request['results'];
+        }
+        $root = self::make('harness', $started, $now, $parent, $attributes);
+        $root['id'] = $server;
+        $root['kind'] = self::SERVER;
+        self::$spans[] = $root;
+
+        $otlp = [];
+        foreach (self::$spans as $span) {
+            $otlp[] = self::otlp($trace_id, $span);
+        }
+        if (function_exists('apcu_store')) {
+            apcu_store(self::PREFIX . self::id(), $otlp, self::TTL);
+        }
+        self::$context = null;
+        self::$spans = self::$stack = self::$fetches = [];
+    }
+
+    /** Post buffered spans to the collector. Returns the number of spans sent. */
+    public static function export() {
+        if (!self::enabled() || !class_exists('APCUIterator')) {
+            return 0;
+        }
+        $spans = [];
+        $requests = 0;
+        foreach (new APCUIterator('/^' . self::PREFIX . '/') as $entry) {
+            if (apcu_delete($entry['key'])) { // another export may have taken it
+                array_push($spans, ...$entry['value']);
+            }
+            if (++$requests >= self::MAX_BATCH) {
+                break;
+            }
+        }
+        if (empty($spans)) {
+            return 0;
+        }
+
+        $body = json_encode(['resourceSpans' => [[
+            'resource' => ['attributes' => self::attributes([
+                'service.name' => getenv('FOURGET_TRACE_SERVICE') ?: '4get-sidecar',
+                'host.name' => gethostname(),
+            ])],
+            'scopeSpans' => [['scope' => ['name' => '4get-sidecar'], 'spans' => $spans]],
+        ]]], JSON_UNESCAPED_SLASHES);
+
+        $curl = curl_init(getenv('FOURGET_OTLP_ENDPOINT'));
+        curl_setopt_array($curl, [
+            CURLOPT_POST => true,
+            CURLOPT_POSTFIELDS => $body,
+            CURLOPT_HTTPHEADER => ['Content-Type: application/json'],
+            CURLOPT_RETURNTRANSFER => true,
+            CURLOPT_TIMEOUT_MS => self::EXPORT_TIMEOUT_MS,
+            CURLOPT_NOSIGNAL => 1,
+        ]);
+        curl_exec($curl);
+        $status = curl_getinfo($curl, CURLINFO_HTTP_CODE);
+        curl_close($curl);
+        if ($status < 200 || $status >= 300) {
+            error_log("Trace export failed (HTTP $status), " . count($spans) . " spans dropped");
+            return 0;
+        }
+        return count($spans);
+    }
+
+    private static function current() {
+        $top = end(self::$stack);
+        return $top !== false ? $top['id'] : self::$context[2];
+    }
+
+    private static function make($name, $start, $end, $parent, $attributes) {
+        return [
+            'id' => self::id(), 'parent' => $parent, 'name' => $name, 'kind' => self::INTERNAL,
+            'start' => $start, 'end' => $end, 'attributes' => $attributes, 'error' => null
+        ];
+    }
+
+    private static function otlp($trace_id, $span) {
+        $otlp = [
+            'traceId' => $trace_id,
+            'spanId' => $span['id'],
+            'parentSpanId' => $span['parent'],
+            'name' => $span['name'],
+            'kind' => $span['kind'],
+            'startTimeUnixNano' => self::nanos($span['start']),
+            'endTimeUnixNano' => self::nanos(max($span['end'], $span['start'])),
+            'attributes' => self::attributes($span['attributes']),
+        ];
+        if ($span['error'] !== null) {
+            $otlp['status'] = ['code' => 2, 'message' => (string)$span['error']];
+        }
+        return $otlp;
+    }
+
+    private static function attributes($values) {
+        $attributes = [];
+        foreach ($values as $key => $value) {
+            if ($value === null) {
+                continue;
+            } elseif (is_bool($value)) {
+                $typed = ['boolValue' => $value];
+            } elseif (is_int($value)) {
+                $typed = ['intValue' => (string)$value];
+            } elseif (is_float($value)) {
+                $typed = ['doubleValue' => $value];
+            } else {
+                $typed = ['stringValue' => (string)$value];
+            }
+            $attributes[] = ['key' => $key, 'value' => $typed];
+        }
+        return $attributes;
+    }
+
+    /** Epoch seconds (float) as an OTLP nanosecond string; floats only carry microseconds anyway. */
+    private static function nanos($seconds) {
+        return sprintf('%.0f000', $seconds * 1000000);
+    }
+
+    private static function id() {
+        return bin2hex(random_bytes(8));
+    }
+}
@@ -0,0 +1,18 @@
+<?php
+/**
+ * Ships the spans trace.php buffered in APCu to FOURGET_OTLP_ENDPOINT.
+ * Called every couple of seconds by a loop in entrypoint.sh; localhost only.
+ */
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+header('Content-Type: application/json');
+
+if (!in_array($_SERVER['REMOTE_ADDR'] ?? '', ['127.0.0.1', '::1'], true)) {
+    http_response_code(403);
+    echo json_encode([]);
+    exit;
+}
+
+require_once __DIR__ . '/trace.php';
+
+echo json_encode(['exported' => trace::export()]);
@@ -0,0 +1,209 @@
+<?php
+/**
+ * Upstream connection reuse for scraper curl handles, within a request.
+ *
+ * Scrapers build their own handles, so everything here is applied from
+ * backend::assign_proxy(), which every scraper calls before curl_exec.
+ * - DNS answers are cached in APCu and pinned with CURLOPT_RESOLVE (direct connections only)
+ * - DNS/TLS session/connection caches are shared through a curl share handle, so
+ *   the handles one scrape opens (consent redirects, follow-up pages) reuse the
+ *   first one's connection; the share dies with the request (PHP 8.2, no
+ *   curl_share_init_persistent)
+ * - Reuse counters per engine land in APCu and are reported by health.php
+ * - The client deadline (backend::$context['deadline']) caps every transfer
+ * - Cached challenge clearance (solver.php) rides along for the engine + proxy
+ * - Cookie jars (jar.php) are loaded into each handle and harvested after it ran
+ * - Traced requests get an upstream.fetch span per transfer (trace.php)
+ */
+class upstream {
+    const DNS_TTL = 300;
+    const STATS_PREFIX = '4get_up_';
+
+    private static $share = null;
+    private static $handles = [];
+
+    public static function attach($curl, $proxy) {
+        curl_setopt($curl, CURLOPT_TCP_KEEPALIVE, 1);
+        curl_setopt($curl, CURLOPT_DNS_CACHE_TIMEOUT, self::DNS_TTL);
+        self::apply_deadline($curl);
+
+        $share = self::share();
+        if ($share !== null) {
+            curl_setopt($curl, CURLOPT_SHARE, $share);
+        }
+
+        $direct = ($proxy === '127.0.0.1' || empty($proxy));
+        $target = $direct ? self::target($curl) : null;
+        $dns_hit = false;
+
+        $engine = backend::$context['engine'] ?? '';
+        if (solver::enabled()) {
+            curl_setopt($curl, CURLINFO_HEADER_OUT, true); // solver::learn_headers() reads it back
+            solver::apply($curl, $engine, $proxy, curl_getinfo($curl, CURLINFO_EFFECTIVE_URL));
+        }
+
+        if (jar::enabled()) {
+            // Earlier handles of this request may have picked up cookies (consent, redirects) the next one needs
+            foreach (self::$handles as [$previous, , , $previous_proxy]) {
+                if (self::executed($previous)) {
+                    jar::save($previous, $engine, $previous_proxy);
+                }
+            }
+            jar::load($curl, $engine, $proxy);
+        }
+
+        if ($target !== null) {
+            $ip = apcu_fetch("4get_dns_$target");
+            if ($ip !== false) {
+                $address = strpos($ip, ':') !== false ? "[$ip]" : $ip;
+                curl_setopt($curl, CURLOPT_RESOLVE, ["$target:$address"]);
+                $dns_hit = true;
+            }
+        }
+
+        if (trace::active()) {
+            trace::fetch_started($curl);
+        }
+
+        if (empty(self::$handles)) {
+            register_shutdown_function([self::class, 'record']);
+        }
+        self::$handles[] = [$curl, $target, $dns_hit, $proxy];
+    }
+
+    /** [url, proxy] of the last handle the scraper prepared, e.g. the request that hit a challenge. */
+    public static function last_request() {
+        $last = end(self::$handles);
+        if ($last === false) {
+            return [null, null];
+        }
+        return [curl_getinfo($last[0], CURLINFO_EFFECTIVE_URL) ?: null, $last[3]];
+    }
+
+    /** Shutdown hook: harvest connection info from every handle the scraper ran. */
+    public static function record() {
+        $engine = backend::$context['engine'] ?? 'unknown';
+
+        $jars = jar::enabled();
+        $solver = solver::enabled();
+        $traced = trace::active();
+
+        foreach (self::$handles as [$curl, $target, $dns_hit, $proxy]) {
+            $info = @curl_getinfo($curl);
+            if (!is_array($info) || empty($info['total_time'])) {
+                continue; // never executed
+            }
+
+            if ($jars) {
+                jar::save($curl, $engine, $proxy);
+            }
+            if ($solver) {
+                solver::learn_headers($curl, $engine);
+            }
+            if ($traced) {
+                trace::fetch_done($curl, $info);
+            }
+
+            $connects = defined('CURLINFO_NUM_CONNECTS') ? curl_getinfo($curl, CURLINFO_NUM_CONNECTS) : null;
+            self::bump($engine, 'requests');
+            if ($connects === 0) {
+                self::bump($engine, 'reused');
+            }
+
+            if ($target !== null) {
+                self::bump($engine, $dns_hit ? 'dns_hits' : 'dns_misses');
+                if (!$dns_hit && !empty($info['primary_ip'])) {
+                    apcu_store("4get_dns_$target", $info['primary_ip'], self::DNS_TTL);
+                }
+            }
+        }
+        self::$handles = [];
+    }
+
+    /** Per-engine reuse summary for health.php. */
+    public static function stats() {
+        $stats = [];
+        if (!class_exists('APCUIterator')) {
+            return $stats;
+        }
+
+        foreach (new APCUIterator('/^' . self::STATS_PREFIX . '/') as $entry) {
+            [$engine, $field] = explode(':', substr($entry['key'], strlen(self::STATS_PREFIX)), 2);
+            $stats[$engine][$field] = $entry['value'];
+        }
+
+        foreach ($stats as $engine => $s) {
+            $requests = $s['requests'] ?? 0;
+            $lookups = ($s['dns_hits'] ?? 0) + ($s['dns_misses'] ?? 0);
+            $stats[$engine]['reuse_ratio'] = $requests ? round(($s['reused'] ?? 0) / $requests, 3) : null;
+            $stats[$engine]['dns_hit_ratio'] = $lookups ? round(($s['dns_hits'] ?? 0) / $lookups, 3) : null;
+        }
+        ksort($stats);
+        return $stats;
+    }
+
+    private static function share() {
+        if (self::$share !== null) {
+            return self::$share ?: null;
+        }
+
+        $locks = [CURL_LOCK_DATA_DNS, CURL_LOCK_DATA_SSL_SESSION];
+        if (defined('CURL_LOCK_DATA_CONNECT')) {
+            $locks[] = CURL_LOCK_DATA_CONNECT;
+        }
+
+        try {
+            $share = curl_share_init();
+            foreach ($locks as $lock) {
+                curl_share_setopt($share, CURLSHOPT_SHARE, $lock);
+            }
+            self::$share = $share;
+        } catch (Throwable $e) {
+            error_log("Hijacker: curl share init failed: " . $e->getMessage());
+            self::$share = false;
+            return null;
+        }
+        return self::$share;
+    }
+
+    /** Milliseconds left before the client deadline, or null when none was sent. */
+    public static function remaining_ms() {
+        $deadline = backend::$context['deadline'] ?? null;
+        if (!$deadline) {
+            return null;
+        }
+        return (int)(($deadline - microtime(true)) * 1000);
+    }
+
+    private static function apply_deadline($curl) {
+        $remaining = self::remaining_ms();
+        if ($remaining === null) {
+            return;
+        }
+        $remaining = max(1, $remaining);
+        curl_setopt($curl, CURLOPT_NOSIGNAL, 1); // required for sub-second timeouts
+        curl_setopt($curl, CURLOPT_TIMEOUT_MS, $remaining);
+        curl_setopt($curl, CURLOPT_CONNECTTIMEOUT_MS, $remaining);
+    }
+
+    private static function executed($curl) {
+        $info = @curl_getinfo($curl);
+        return is_array($info) && !empty($info['total_time']);
+    }
+
+    private static function target($curl) {
+        $url = curl_getinfo($curl, CURLINFO_EFFECTIVE_URL);
+        $parts = $url ? parse_url($url) : false;
+        if (empty($parts['host'])) {
+            return null;
+        }
+        $port = $parts['port'] ?? (($parts['scheme'] ?? 'https') === 'http' ? 80 : 443);
+        return $parts['host'] . ':' . $port;
+    }
+
+    private static function bump($engine, $field) {
+        $key = self::STATS_PREFIX . "$engine:$field";
+        apcu_add($key, 0, 0);
+        apcu_inc($key);
+    }
+}
@@ -0,0 +1,127 @@
+<?php
+/**
+ * Background cache warmer (CLI, started by entrypoint.sh).
+ *
+ * Keeps the result windows and pagination tokens of the most popular recent
+ * queries (popular.php, served by queries.php) filled: right after start from the
+ * list saved by the previous run, which is also fed back into popular.php so the
+ * next save keeps it, then every FOURGET_WARM_INTERVAL seconds for entries whose
+ * window is gone or expires within FOURGET_WARM_AHEAD seconds.
+ * Warm-ups go through harness.php in the bulk lane at FOURGET_WARM_RATE requests
+ * per second; an engine that answers overloaded/challenge/error is left alone
+ * for a while.
+ *
+ * FOURGET_WARM_TOP        queries kept warm per engine/method (default 0 = off)
+ * FOURGET_WARM_MIN_HITS   decayed hits a query needs to be kept warm (default 2)
+ * FOURGET_WARM_RATE       warm-up requests per second (default 0.5)
+ * FOURGET_WARM_INTERVAL   seconds between refresh rounds (default 60)
+ * FOURGET_WARM_AHEAD      refresh windows expiring within this many seconds (default 90)
+ * FOURGET_WARM_FILE       popular list saved across restarts (default /var/lib/4get/popular.json)
+ */
+
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+
+require_once __DIR__ . '/popular.php';
+
+const BACKOFF = 300; // seconds an engine is skipped after a failed warm-up, unless it asked for less
+const LIMIT = 10; // page size warm-ups fill, matching the client's DEFAULT_PAGE_SIZE
+
+if (popular::top_n() === 0) {
+    exit(0);
+}
+
+$env = fn($name, $default) => getenv($name) !== false ? getenv($name) : $default;
+$min_hits = (float)$env('FOURGET_WARM_MIN_HITS', 2);
+$rate = max(0.01, (float)$env('FOURGET_WARM_RATE', 0.5));
+$interval = max(10, (int)$env('FOURGET_WARM_INTERVAL', 60));
+$ahead = (int)$env('FOURGET_WARM_AHEAD', 90);
+$file = $env('FOURGET_WARM_FILE', '/var/lib/4get/popular.json');
+$base = 'http://127.0.0.1';
+
+function http($url, $payload = null) {
+    $options = ['timeout' => 30, 'ignore_errors' => true];
+    if ($payload !== null) {
+        $options += ['method' => 'POST', 'header' => "Content-Type: application/json\r\n", 'content' => json_encode($payload)];
+    }
+    $body = @file_get_contents($url, false, stream_context_create(['http' => $options]));
+    return $body === false ? null : json_decode($body, true);
+}
+
+/** Interleave engines so a round doesn't hit one upstream back to back. */
+function worklist($popular, $min_hits, $ahead) {
+    $queues = [];
+    foreach ($popular as $engine => $methods) {
+        foreach ($methods as $method => $entries) {
+            foreach ($entries as $entry) {
+                if ($entry['hits'] >= $min_hits && $entry['expires_in'] <= $ahead) {
+                    $queues[$engine][] = [$engine, $method, $entry];
+                }
+            }
+        }
+    }
+    $work = [];
+    while ($queues) {
+        foreach ($queues as $engine => &$queue) {
+            $work[] = array_shift($queue);
+            if (!$queue) {
+                unset($queues[$engine]);
+            }
+        }
+        unset($queue);
+    }
+    return $work;
+}
+
+function warm($base, $work, $rate, &$skip_until) {
+    $done = 0;
+    foreach ($work as [$engine, $method, $entry]) {
+        if (($skip_until[$engine] ?? 0) > time()) {
+            continue;
+        }
+        $reply = http("$base/harness.php", [
+            'engine' => $engine,
+            'category' => $method,
+            'warm' => true,
+            'priority' => 'bulk',
+            'limit' => LIMIT * max(1, (int)$entry['pages']),
+            'params' => $entry['params']
+        ]);
+        if (!is_array($reply) || ($reply['status'] ?? '') === 'error') {
+            $skip_until[$engine] = time() + min(BACKOFF, (int)($reply['retry_after'] ?? BACKOFF));
+        } else {
+            $done++;
+        }
+        usleep((int)(1000000 / $rate));
+    }
+    return $done;
+}
+
+// Wait for Apache, then refill what was popular before the restart
+for ($i = 0; $i < 60 && http("$base/health.php") === null; $i++) {
+    sleep(1);
+}
+
+$skip_until = [];
+if (is_readable($file)) {
+    $saved = json_decode(file_get_contents($file), true) ?: [];
+    // Warm-ups don't count as hits: seed the list, or the first save after the restart would drop it
+    http("$base/queries.php", ['seen' => filemtime($file), 'popular' => $saved]);
+    // Windows died with the old process: warm everything that was popular
+    $work = worklist($saved, $min_hits, PHP_INT_MAX);
+    $done = warm($base, $work, $rate, $skip_until);
+    error_log("Warmer: restored $done/" . count($work) . " popular queries from $file");
+}
+
+while (true) {
+    sleep($interval);
+    $popular = http("$base/queries.php");
+    if (!is_array($popular)) {
+        continue;
+    }
+    if ($popular) {
+        @mkdir(dirname($file), 0755, true);
+        @file_put_contents($file . '.tmp', json_encode($popular)) && @rename($file . '.tmp', $file);
+    }
+    warm($base, worklist($popular, $min_hits, $ahead), $rate, $skip_until);
+}
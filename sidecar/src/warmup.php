@@ -0,0 +1,104 @@
+<?php
+/**
+ * Startup warm-up (CLI, started by entrypoint.sh before Apache takes traffic).
+ *
+ * Sends one cheap query per engine through harness.php, a few at a time, so
+ * scrapers are compiled into OPcache, upstream DNS answers land in APCu, and
+ * the first result pages and canary samples are cached. health.php answers
+ * 503 "warming" until this finishes or FOURGET_WARMUP_TIMEOUT runs out.
+ *
+ * FOURGET_WARMUP              0 = off (ready right away)
+ * FOURGET_WARMUP_ENGINES      comma separated engines (default: every manifest engine)
+ * FOURGET_WARMUP_QUERY        the query sent (default "weather")
+ * FOURGET_WARMUP_TIMEOUT      seconds before giving up and reporting ready anyway (default 60)
+ * FOURGET_WARMUP_CONCURRENCY  queries in flight (default 4)
+ * FOURGET_WARMUP_STATE        state file shared with health.php (default /tmp/4get-warmup.json)
+ */
+
+ini_set('display_errors', 0);
+ini_set('log_errors', 1);
+
+const REQUEST_TIMEOUT = 15;
+
+$state_file = getenv('FOURGET_WARMUP_STATE') ?: '/tmp/4get-warmup.json';
+$timeout = (int)(getenv('FOURGET_WARMUP_TIMEOUT') ?: 60);
+$concurrency = max(1, (int)(getenv('FOURGET_WARMUP_CONCURRENCY') ?: 4));
+$query = getenv('FOURGET_WARMUP_QUERY') ?: 'weather';
+$base = 'http://127.0.0.1';
+$started = time();
+$deadline = $started + $timeout;
+
+$state = ['state' => 'warming', 'started' => $started, 'deadline' => $deadline, 'engines' => 0, 'done' => 0, 'failed' => []];
+$save = function ($changes) use (&$state, $state_file) {
+    $state = $changes + $state;
+    file_put_contents($state_file . '.tmp', json_encode($state)) && rename($state_file . '.tmp', $state_file);
+};
+
+$manifest = json_decode(@file_get_contents(__DIR__ . '/manifest.json'), true) ?: [];
+$engines = array_keys($manifest);
+if (getenv('FOURGET_WARMUP_ENGINES')) {
+    $wanted = array_map(fn($e) => str_replace('-', '_', trim($e)), explode(',', getenv('FOURGET_WARMUP_ENGINES')));
+    $engines = array_values(array_intersect($engines, $wanted));
+}
+$save(['engines' => count($engines)]);
+
+// Wait for Apache; health.php already answers (503) while we warm
+while (time() < $deadline && @file_get_contents("$base/health.php", false, stream_context_create(['http' => ['ignore_errors' => true, 'timeout' => 2]])) === false) {
+    sleep(1);
+}
+
+$request = function ($engine) use ($manifest, $base, $query, $deadline) {
+    // Web when the scraper has it: its first page also harvests the image/video/news carousels
+    $methods = $manifest[$engine]['methods'] ?? ['web'];
+    $curl = curl_init("$base/harness.php");
+    curl_setopt_array($curl, [
+        CURLOPT_POST => true,
+        CURLOPT_POSTFIELDS => json_encode([
+            'engine' => $engine,
+            'category' => in_array('web', $methods, true) ? 'web' : $methods[0],
+            'probe' => true, // counts as a canary sample too
+            'deadline' => min($deadline, time() + REQUEST_TIMEOUT),
+            'params' => ['s' => $query]
+        ]),
+        CURLOPT_HTTPHEADER => ['Content-Type: application/json'],
+        CURLOPT_RETURNTRANSFER => true,
+        CURLOPT_TIMEOUT => REQUEST_TIMEOUT + 2,
+    ]);
+    return $curl;
+};
+
+$multi = curl_multi_init();
+$pending = $engines;
+$running = [];
+$done = 0;
+$failed = [];
+while (($pending || $running) && time() < $deadline) {
+    while ($pending && count($running) < $concurrency) {
+        $engine = array_shift($pending);
+        $curl = $request($engine);
+        curl_multi_add_handle($multi, $curl);
+        $running[spl_object_id($curl)] = $engine;
+    }
+
+    curl_multi_exec($multi, $active);
+    curl_multi_select($multi, 0.5);
+    while ($info = curl_multi_info_read($multi)) {
+        $curl = $info['handle'];
+        $engine = $running[spl_object_id($curl)];
+        $reply = json_decode((string)curl_multi_getcontent($curl), true);
+        if ($info['result'] !== CURLE_OK || !is_array($reply) || ($reply['status'] ?? '') === 'error') {
+            $failed[] = $engine;
+        }
+        $done++;
+        unset($running[spl_object_id($curl)]);
+        curl_multi_remove_handle($multi, $curl);
+        curl_close($curl);
+        $save(['done' => $done, 'failed' => $failed]);
+    }
+}
+curl_multi_close($multi);
+
+$timed_out = $pending || $running;
+$save(['state' => $timed_out ? 'timeout' : 'ready', 'finished' => time()]);
+error_log(sprintf("Warm-up %s: %d/%d engines in %ds, failed: %s", $timed_out ? 'timed out' : 'done',
+    $done, count($engines), time() - $started, $failed ? implode(', ', $failed) : 'none'));
@@ -0,0 +1,193 @@
+<?php
+/**
+ * Result windows: scrapers often return 20-100 items per upstream call while
+ * SearXNG pages step by the client's page size. The full upstream batch is kept
+ * per (engine, method, query + filters) and SearXNG pages are sliced out of it;
+ * the scraper only runs again when a window runs past the cached items.
+ *
+ * Window layout: ['base' => upstream offset of items[0], 'items' => [...],
+ *                 'npt' => token for the batch after the last item, 'extras' => first batch's other keys]
+ *
+ * Pagination tokens are kept per window key by the offset of the batch they
+ * fetch, with a chain index so a deep page can start walking from the closest one.
+ *
+ * The image/video/news carousels of a first web page are harvested for a short
+ * while, so switching to that tab can be answered without scraping again.
+ */
+class window {
+    const TTL = 600;
+    const MAX_ITEMS = 500;
+    const MAX_FETCHES = 3; // upstream batches fetched to fill one window
+    const LEARN_WEIGHT = 0.3; // EMA weight of a new batch size observation
+    const TOKEN_TTL = 3600;
+    const CHAIN_MAX = 200; // offsets remembered per window key
+    const TIME_BUCKET = 3600; // seconds of newer/older that share a window and its tokens
+
+    // Deep pages without a token walk the npt chain (FOURGET_WALK_MAX_DEPTH, FOURGET_WALK_BUDGET_MS)
+    const WALK_MAX_DEPTH = 10; // upstream calls for one page, including the final batch
+    const WALK_BUDGET_MS = 2500; // capped by the client deadline
+
+    // web result key => method whose first page it can stand in for (FOURGET_HARVEST_TTL, 0 = off)
+    const HARVEST = ['image' => 'image', 'video' => 'video', 'news' => 'news'];
+    const HARVEST_TTL = 120;
+
+    // 4get result key holding a method's primary list
+    const PRIMARY = ['web' => 'web', 'image' => 'image', 'video' => 'video', 'news' => 'news', 'music' => 'song'];
+
+    public static function primary($method) {
+        return self::PRIMARY[$method] ?? $method;
+    }
+
+    public static function key($engine, $method, $params) {
+        unset($params['offset'], $params['npt']);
+        // The client derives newer/older from the current second: bucket them so a time range keeps its window
+        foreach (['newer', 'older'] as $bound) {
+            if (!empty($params[$bound]) && is_numeric($params[$bound])) {
+                $params[$bound] = intdiv((int)$params[$bound], self::TIME_BUCKET);
+            }
+        }
+        ksort($params);
+        return '4get_win_' . md5($engine . '|' . $method . '|' . json_encode($params));
+    }
+
+    public static function fetch($key) {
+        return apcu_fetch($key);
+    }
+
+    public static function store($key, $win) {
+        // Keep the tail: it's where the next pages and the npt continue from
+        $drop = count($win['items']) - self::MAX_ITEMS;
+        if ($drop > 0) {
+            $win['items'] = array_slice($win['items'], $drop);
+            $win['base'] += $drop;
+        }
+        apcu_store($key, $win, self::TTL);
+    }
+
+    /** Start a window from a scraper result fetched at upstream offset $base. */
+    public static function from_result($result, $method, $base) {
+        $primary = self::primary($method);
+        $items = is_array($result[$primary] ?? null) ? $result[$primary] : [];
+        $npt = $result['npt'] ?? null;
+        unset($result[$primary], $result['npt']);
+        return ['base' => $base, 'items' => $items, 'npt' => $npt, 'extras' => $result];
+    }
+
+    public static function append(&$win, $result, $method) {
+        $primary = self::primary($method);
+        if (is_array($result[$primary] ?? null)) {
+            array_push($win['items'], ...$result[$primary]);
+        }
+        $win['npt'] = $result['npt'] ?? null;
+    }
+
+    /** Window holds [offset, offset + limit), or everything that exists past offset. */
+    public static function covers($win, $offset, $limit) {
+        if ($offset < $win['base']) {
+            return false;
+        }
+        return $offset + $limit <= $win['base'] + count($win['items']) || empty($win['npt']);
+    }
+
+    /** Build the response for one SearXNG page; extras only ride along on the first page. */
+    public static function slice($win, $method, $offset, $limit) {
+        $result = $offset === 0 ? $win['extras'] : [];
+        $result[self::primary($method)] = array_slice($win['items'], $offset - $win['base'], $limit);
+        $result['npt'] = $win['npt'];
+        return $result;
+    }
+
+    /** Learned upstream batch size for (engine, method), or null before the first observation. */
+    public static function page_size($engine, $method) {
+        $size = apcu_fetch("4get_pagesize_$engine:$method");
+        return $size === false ? null : (int)round($size);
+    }
+
+    public static function learn($engine, $method, $count) {
+        if ($count <= 0) {
+            return;
+        }
+        $key = "4get_pagesize_$engine:$method";
+        $size = apcu_fetch($key);
+        $size = $size === false ? $count : $size + self::LEARN_WEIGHT * ($count - $size);
+        apcu_store($key, $size, 0);
+    }
+
+    /** Deterministic offset -> npt token mapping for pages the client asks for out of a window. */
+    public static function det_key($engine, $method, $params, $offset) {
+        return '4get_det_' . md5(self::key($engine, $method, $params) . '|' . $offset);
+    }
+
+    /** Store the token fetching the upstream batch that starts at $offset. */
+    public static function remember_token($engine, $method, $params, $offset, $npt) {
+        if (empty($npt) || $offset <= 0) {
+            return;
+        }
+        apcu_store(self::det_key($engine, $method, $params, $offset), $npt, self::TOKEN_TTL);
+
+        $key = self::chain_key($engine, $method, $params);
+        $chain = apcu_fetch($key) ?: [];
+        $chain[$offset] = true;
+        if (count($chain) > self::CHAIN_MAX) {
+            ksort($chain);
+            $chain = array_slice($chain, -self::CHAIN_MAX, null, true);
+        }
+        apcu_store($key, $chain, self::TOKEN_TTL);
+    }
+
+    /**
+     * Upstream calls to reach [offset, offset + limit) from the batch starting at $from:
+     * 0 when that batch already holds $offset (a plain fetch), else the length of the walk.
+     */
+    public static function hops($from, $offset, $limit, $size) {
+        $size = max(1, $size);
+        return $offset < $from + $size ? 0 : (int)ceil(($offset + $limit - $from) / $size);
+    }
+
+    /** Nearest stored batch start at or below $offset as [offset, token]; [0, null] = the first batch. */
+    public static function closest_token($engine, $method, $params, $offset) {
+        $token = apcu_fetch(self::det_key($engine, $method, $params, $offset));
+        if ($token) {
+            return [$offset, $token];
+        }
+
+        $chain = apcu_fetch(self::chain_key($engine, $method, $params)) ?: [];
+        krsort($chain);
+        foreach ($chain as $position => $_) {
+            if ($position >= $offset) {
+                continue;
+            }
+            $token = apcu_fetch(self::det_key($engine, $method, $params, $position));
+            if ($token) {
+                return [$position, $token];
+            }
+        }
+        return [0, null];
+    }
+
+    /** Keep the carousels of a first web page under the (engine, method, params) they answer. */
+    public static function harvest($engine, $params, $result) {
+        $ttl = (int)(getenv('FOURGET_HARVEST_TTL') !== false ? getenv('FOURGET_HARVEST_TTL') : self::HARVEST_TTL);
+        if ($ttl <= 0) {
+            return;
+        }
+        foreach (self::HARVEST as $key => $method) {
+            if (!empty($result[$key]) && is_array($result[$key])) {
+                apcu_store(self::harvest_key($engine, $method, $params), $result[$key], $ttl);
+            }
+        }
+    }
+
+    /** Harvested first-page items for (engine, method, params), or false. */
+    public static function harvested($engine, $method, $params) {
+        return apcu_fetch(self::harvest_key($engine, $method, $params));
+    }
+
+    private static function harvest_key($engine, $method, $params) {
+        return '4get_harvest_' . substr(self::key($engine, $method, $params), strlen('4get_win_'));
+    }
+
+    private static function chain_key($engine, $method, $params) {
+        return '4get_chain_' . substr(self::key($engine, $method, $params), strlen('4get_win_'));
+    }
+}
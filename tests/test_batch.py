@@ -0,0 +1,51 @@
+"""normalize_many (searx/engines/fourget_batch.py): input order, errors in place, JSONL input.
+
+Needs SearXNG importable (searx on PYTHONPATH), like the engine modules themselves.
+"""
+import os
+import sys
+import json
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "searx", "engines"))
+pytest.importorskip("searx.exceptions")
+
+from fourget_batch import normalize_many  # noqa: E402
+
+
+def doc(i):
+    return {"status": "ok", "web": [{"title": f"t{i}", "url": f"https://a.example/{i}", "description": "d"}]}
+
+
+def urls(out):
+    return [results[0]["url"] if results else error.split(":")[0] for results, error in out]
+
+
+def expected(n, broken=()):
+    return ["JSONDecodeError" if i in broken else f"https://a.example/{i}" for i in range(n)]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results_come_back_in_input_order(workers):
+    docs = [doc(i) for i in range(50)]
+    out = list(normalize_many(docs, workers=workers, chunksize=4, progress=lambda done, rate: None))
+    assert urls(out) == expected(50)
+
+
+def test_bad_documents_keep_their_place(tmp_path):
+    path = tmp_path / "raw.jsonl"
+    lines = [json.dumps({"raw": doc(i)}) for i in range(10)]
+    lines[3] = "{not json"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    out = list(normalize_many(str(path), workers=2, chunksize=3, field="raw", progress=lambda done, rate: None))
+    assert urls(out) == expected(10, broken={3})
+    assert out[3][0] == []
+
+
+def test_progress_reports_every_document():
+    seen = []
+    list(normalize_many([doc(i) for i in range(7)], workers=1, chunksize=2, progress=lambda done, rate: seen.append(done)))
+    assert seen[-1] == 7
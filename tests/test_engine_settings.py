@@ -0,0 +1,54 @@
+"""fg_* engine settings validated against the sidecar filter catalog (FourgetHijackerClient.init_engine).
+
+Needs SearXNG importable (searx on PYTHONPATH), like the engine modules themselves.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "searx", "engines"))
+pytest.importorskip("searx.exceptions")
+
+from fourget_hijacker_client import FourgetHijackerClient  # noqa: E402
+
+CATALOG = {
+    "google": {
+        "web": {
+            "country": {"display": "Country", "option": {"any": "Instance's country", "us": "United States"}},
+            "rm_dupes": {"display": "Remove duplicates", "option": {"yes": "Yes", "no": "No"}},
+            "newer": {"display": "Newer than", "option": "_DATE"},
+        },
+        "images": {"size": {"display": "Size", "option": ["any", "large", "medium"]}},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch):
+    monkeypatch.setattr(FourgetHijackerClient, "_filter_catalog", CATALOG)
+    monkeypatch.setattr(FourgetHijackerClient, "_ENGINE_PARAMS", {})
+
+
+def test_values_map_onto_option_keys():
+    settings = {"fg_country": "US", "fg_rm_dupes": False, "fg_newer": "2024-01-01", "fg_size": 1}
+    assert FourgetHijackerClient.init_engine("google", settings) is True
+    assert FourgetHijackerClient._ENGINE_PARAMS["google"] == {
+        "country": "us", "rm_dupes": "no", "newer": "2024-01-01", "size": "1",
+    }
+
+
+def test_unknown_filter_fails_init():
+    assert FourgetHijackerClient.init_engine("google", {"fg_colour": "red"}) is False
+    assert "google" not in FourgetHijackerClient._ENGINE_PARAMS
+
+
+def test_invalid_value_fails_init():
+    assert FourgetHijackerClient.init_engine("google", {"fg_country": "atlantis"}) is False
+
+
+def test_uncatalogued_engine_forwards_settings_unchecked():
+    assert FourgetHijackerClient.init_engine("mojeek", {"fg_anything": "x"}) is True
+    assert FourgetHijackerClient._ENGINE_PARAMS["mojeek"] == {"anything": "x"}
+
@@ -0,0 +1,96 @@
+"""LoadGovernor (searx/engines/fourget_load_governor.py) on a fake clock: level steps, recovery, per-engine state."""
+import os
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "searx", "engines"))
+
+import fourget_load_governor  # noqa: E402
+from fourget_load_governor import LoadGovernor  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fourget_load_governor, "time", clock)
+    for state in ("_samples", "_level", "_changed", "_computed", "_pending"):
+        monkeypatch.setattr(LoadGovernor, state, {})
+    return clock
+
+
+def answer(engine_id, latency, error=False, challenge=False):
+    params = {}
+    LoadGovernor.dispatched(engine_id, params, 3.0)
+    resp = SimpleNamespace(elapsed=timedelta(seconds=latency), search_params=params)
+    LoadGovernor.observe(engine_id, resp, error, challenge)
+
+
+def traffic(clock, engine_id, latency, error=False, n=LoadGovernor.MIN_SAMPLES, **kwargs):
+    for _ in range(n):
+        answer(engine_id, latency, error, **kwargs)
+    clock.now += LoadGovernor.RECOMPUTE_EVERY
+    return LoadGovernor.level(engine_id)
+
+
+def test_levels_follow_latency_and_errors(clock):
+    assert traffic(clock, "google", 0.5) == 0
+    assert traffic(clock, "google", 5.0, n=3 * LoadGovernor.MIN_SAMPLES) == 3
+
+
+def test_too_few_samples_never_degrade(clock):
+    assert traffic(clock, "google", 9.0, error=True, n=LoadGovernor.MIN_SAMPLES - 1) == 0
+
+
+def test_error_rate_alone_escalates(clock):
+    traffic(clock, "google", 0.2, n=15)
+    assert traffic(clock, "google", 0.2, error=True, n=5) == 2  # 25% errors
+
+
+def test_recovery_steps_down_one_level_per_cooldown(clock):
+    assert traffic(clock, "google", 5.0) == 3
+    clock.now += LoadGovernor.WINDOW_SECONDS  # slow samples age out
+    levels = [traffic(clock, "google", 0.2)]
+    levels.append(traffic(clock, "google", 0.2))  # within the cooldown of that step
+    for _ in range(2):
+        clock.now += LoadGovernor.COOLDOWN
+        levels.append(traffic(clock, "google", 0.2))
+    assert levels == [2, 2, 1, 0]
+
+
+def test_engines_are_judged_separately(clock):
+    assert traffic(clock, "google", 5.0) == 3
+    assert traffic(clock, "brave", 0.3) == 0
+    assert LoadGovernor.level("google") == 3
+
+
+def test_unanswered_dispatches_count_as_timeouts(clock):
+    for _ in range(LoadGovernor.MIN_SAMPLES):
+        LoadGovernor.dispatched("google", {}, 3.0)  # SearXNG timed these out: no observe()
+    clock.now += 3.0 + LoadGovernor.STALE_AFTER + 1
+    assert LoadGovernor.level("google") == 3
+    assert not LoadGovernor._pending["google"]
+
+
+def test_answered_dispatches_are_not_counted_twice(clock):
+    traffic(clock, "google", 0.2)
+    clock.now += 60 + LoadGovernor.STALE_AFTER
+    assert LoadGovernor.level("google") == 0
+    assert len(LoadGovernor._samples["google"]) == 0  # aged out, none added as timeouts
+
+
+def test_challenges_are_ignored(clock):
+    assert traffic(clock, "google", 4.0, error=True, challenge=True, n=3 * LoadGovernor.MIN_SAMPLES) == 0
+    assert not LoadGovernor._samples.get("google")
+    assert not LoadGovernor._pending["google"]
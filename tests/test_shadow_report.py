@@ -0,0 +1,60 @@
+"""4get_shadow_report.py against tests/fixtures/shadow.jsonl, an anonymized shadow log.
+
+google:google has four pairs (partial overlap, URLs equal after normalization, a 4get
+error, a 4get timeout written by the shadow thread) and one 4get-only record; duckduckgo:duckduckgo one pair and one native-only record.
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "tests", "fixtures", "shadow.jsonl")
+
+
+def run_report(*args):
+    out = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "4get_shadow_report.py"), FIXTURE, *args],
+        capture_output=True, text=True, check=True,
+    )
+    return out.stdout
+
+
+def test_pairing():
+    report = json.loads(run_report("--json"))
+    assert list(report) == ["duckduckgo:duckduckgo", "google:google"]
+    assert (report["google:google"]["samples"], report["google:google"]["unpaired"]) == (4, 1)
+    assert (report["duckduckgo:duckduckgo"]["samples"], report["duckduckgo:duckduckgo"]["unpaired"]) == (1, 1)
+
+
+def test_overlap():
+    report = json.loads(run_report("--json"))
+    # (2/4 + 1 + 0 + 0) / 4 and (2/3 + 1 + 0 + 0) / 4
+    assert report["google:google"]["mean_jaccard"] == 0.375
+    assert report["google:google"]["mean_native_coverage"] == 0.417
+    assert report["duckduckgo:duckduckgo"]["mean_jaccard"] == 0.333
+    assert report["duckduckgo:duckduckgo"]["mean_native_coverage"] == 0.5
+
+
+def test_latency_and_errors():
+    google = json.loads(run_report("--json"))["google:google"]
+    assert google["4get"] == {
+        "p50_latency": 2.0, "p90_latency": 3.5, "p99_latency": 3.5, "mean_results": 1.0, "error_rate": 0.5,
+    }
+    assert google["native"] == {
+        "p50_latency": 0.6, "p90_latency": 0.8, "p99_latency": 0.8, "mean_results": 1.5, "error_rate": 0.0,
+    }
+
+
+def test_text_report():
+    text = run_report()
+    assert "google:google  (4 paired, 1 unpaired)" in text
+    assert "overlap  jaccard 0.375  native coverage 0.417" in text
+
+
+def test_timeout_counts_as_4get_error():
+    records = [json.loads(line) for line in open(FIXTURE, encoding="utf-8")]
+    timeout = next(r for r in records if r["id"] == "s0007" and r["side"] == "4get")
+    assert (timeout["error"], timeout["count"]) == ("timeout", 0)
+    google = json.loads(run_report("--json"))["google:google"]
+    assert google["4get"]["p99_latency"] == timeout["latency"]
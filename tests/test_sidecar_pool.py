@@ -0,0 +1,71 @@
+"""SidecarPool (searx/engines/fourget_sidecar_pool.py): hash ring routing, ejection and readmission."""
+import os
+import sys
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "searx", "engines"))
+
+from fourget_sidecar_pool import SidecarPool  # noqa: E402
+
+ENDPOINTS = ["http://4get-a:80", "http://4get-b:80/", "http://4get-c:80"]
+QUERIES = [f"query {i}" for i in range(300)]
+
+
+def pool():
+    return SidecarPool(ENDPOINTS, health_interval=0)  # no prober thread: probes are fed by hand
+
+
+def probes(p, endpoint, ok, n):
+    for _ in range(n):
+        p._record_probe(endpoint, ok)
+
+
+def test_routing_is_stable_and_spread():
+    a, b = pool(), pool()
+    owners = [a.route("google", q) for q in QUERIES]
+    assert owners == [b.route("google", q) for q in QUERIES]
+    assert set(owners) == {"http://4get-a:80", "http://4get-b:80", "http://4get-c:80"}
+    assert min(Counter(owners).values()) > len(QUERIES) / 10
+
+
+def test_single_endpoint_always_routes_to_it():
+    p = SidecarPool(["http://4get-a:80"], health_interval=0)
+    assert {p.route("google", q) for q in QUERIES} == {"http://4get-a:80"}
+    assert p.url("google", "q") == "http://4get-a:80/harness.php"
+
+
+def test_ejected_endpoint_only_moves_its_own_keys():
+    p = pool()
+    before = {q: p.route("google", q) for q in QUERIES}
+    probes(p, "http://4get-b:80", False, SidecarPool.EJECT_AFTER)
+    assert p.status()["http://4get-b:80"] is False
+    after = {q: p.route("google", q) for q in QUERIES}
+    assert "http://4get-b:80" not in after.values()
+    assert all(after[q] == owner for q, owner in before.items() if owner != "http://4get-b:80")
+
+
+def test_ejection_needs_consecutive_failures():
+    p = pool()
+    for ok in [False] * (SidecarPool.EJECT_AFTER - 1) + [True] + [False] * (SidecarPool.EJECT_AFTER - 1):
+        p._record_probe("http://4get-a:80", ok)
+    assert p.status()["http://4get-a:80"] is True
+
+
+def test_readmitted_endpoint_gets_its_keys_back():
+    p = pool()
+    before = {q: p.route("google", q) for q in QUERIES}
+    probes(p, "http://4get-c:80", False, SidecarPool.EJECT_AFTER)
+    probes(p, "http://4get-c:80", True, SidecarPool.READMIT_AFTER - 1)
+    assert p.status()["http://4get-c:80"] is False
+    probes(p, "http://4get-c:80", True, 1)
+    assert p.status()["http://4get-c:80"] is True
+    assert {q: p.route("google", q) for q in QUERIES} == before
+
+
+def test_all_ejected_falls_back_to_the_owner():
+    p = pool()
+    owner = p.route("google", "weather")
+    for endpoint in p.endpoints:
+        probes(p, endpoint, False, SidecarPool.EJECT_AFTER)
+    assert p.route("google", "weather") == owner
@@ -0,0 +1,80 @@
+"""4get_timeouts.py: recommendation bounds, the at-limit guard and histogram coverage."""
+import os
+import math
+import importlib.util
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("timeouts", os.path.join(ROOT, "4get_timeouts.py"))
+timeouts = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(timeouts)
+
+ARGS = SimpleNamespace(min=1.0, tail=5.0, step=0.25, min_samples=30, coverage=0.95, max_at_limit=0.05)
+
+
+def samples(latencies, count=10, error=None):
+    return [(latency, count, error) for latency in latencies]
+
+
+def recommend(sample_list, current):
+    return timeouts.recommend(timeouts.tune_from_samples(sample_list, current), current, ARGS)
+
+
+def test_fast_engine_is_clamped_to_min():
+    assert recommend(samples([0.2] * 40), 3.0) == (1.0, "")
+
+
+def test_slow_engine_is_clamped_to_tail():
+    timeout, note = recommend(samples([6.0] * 40), 8.0)
+    assert timeout == 5.0
+    assert "tail budget" in note
+
+
+def test_smallest_timeout_reaching_coverage():
+    # 95% of the results arrive within 2.1s
+    timeout, _ = recommend(samples([1.0] * 19 + [2.1] * 19 + [4.0] * 2), 5.0)
+    assert timeout == 2.25
+
+
+def test_too_few_samples_keep_the_current_timeout():
+    assert recommend(samples([0.2] * 10), 3.0) == (3.0, "only 10 samples")
+
+
+def test_requests_at_the_limit_raise_instead_of_lower():
+    # 10% of the requests ran into the 2s timeout: their data is cut off
+    timeout, note = recommend(samples([0.5] * 36 + [1.9] * 4), 2.0)
+    assert timeout == 2.5
+    assert "ran into the current timeout" in note
+
+
+def test_raise_never_exceeds_the_tail():
+    timeout, _ = recommend(samples([0.5] * 30 + [4.9] * 10), 4.8)
+    assert timeout == 5.0
+
+
+def test_shadow_timeout_records_count_as_cut_off():
+    shadow = samples([0.5] * 36) + samples([2.0] * 4, count=0, error=timeouts.TIMEOUT_ERROR)
+    stats = timeouts.tune_from_samples(shadow, 2.0)
+    assert (stats["at_limit"], stats["error_rate"]) == (0.1, 0.1)
+    assert recommend(shadow, 2.0)[0] == 2.5
+
+
+def test_other_errors_are_not_cut_off():
+    stats = timeouts.tune_from_samples(samples([0.5] * 36) + samples([0.1] * 4, count=0, error="503"), 2.0)
+    assert stats["at_limit"] == 0.0
+
+
+def test_histogram_share_interpolates_within_buckets():
+    buckets = [(0.5, 10.0), (1.0, 30.0), (2.0, 40.0), (math.inf, 50.0)]
+    assert timeouts.histogram_share(buckets, 0.75) == 0.4
+    assert timeouts.histogram_share(buckets, 2.0) == 0.8
+    assert timeouts.histogram_share(buckets, 10.0) == 0.8  # +Inf bucket: never assumed in time
+    assert timeouts.histogram_share([], 1.0) == 0.0
+
+
+def test_histogram_at_limit_uses_the_sidecar_side_of_the_timeout():
+    metrics = {"buckets": [(1.0, 80.0), (2.0, 90.0), (math.inf, 100.0)], "requests": 100.0, "errors": 5.0}
+    stats = timeouts.tune_from_histogram(metrics, 2.15)
+    # sidecar limit (2.15 - HOP_OVERHEAD) * 0.9 = 1.8s, 88% of requests done by then
+    assert stats["at_limit"] == 0.12
+    assert stats["error_rate"] == 0.05
@@ -0,0 +1,47 @@
+"""Result window planning in sidecar/src/window.php, run through the php CLI (skipped without it)."""
+import os
+import json
+import shutil
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHP = shutil.which("php")
+
+pytestmark = pytest.mark.skipif(PHP is None, reason="php CLI not installed")
+
+
+def php(code):
+    script = f"require {json.dumps(os.path.join(ROOT, 'sidecar', 'src', 'window.php'))};\n{code}"
+    out = subprocess.run([PHP, "-r", script], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_hops_inside_next_batch_is_a_plain_fetch():
+    assert php("echo json_encode(window::hops(20, 30, 10, 20));") == 0
+    assert php("echo json_encode(window::hops(0, 15, 10, 20));") == 0
+
+
+def test_deep_jump_past_an_existing_window_walks():
+    # Window over 0..20 (one batch of 20), client jumps to offset 90
+    result = php("""
+        $batch = fn($from) => ['web' => range($from, $from + 19), 'npt' => 'npt' . ($from + 20)];
+        $win = window::from_result($batch(0), 'web', 0);
+        $hops = window::hops($win['base'] + count($win['items']), 90, 10, 20);
+        $fetches = 0;
+        while (!window::covers($win, 90, 10) && $fetches < window::WALK_MAX_DEPTH) {
+            window::append($win, $batch($win['base'] + count($win['items'])), 'web');
+            $fetches++;
+        }
+        echo json_encode([$hops, $fetches, window::slice($win, 'web', 90, 10)['web']]);
+    """)
+    hops, fetches, page = result
+    assert hops == 4
+    assert fetches == hops
+    assert page == list(range(90, 100))
+
+
+def test_deep_jump_beyond_the_walk_depth_is_rejected():
+    hops = php("echo json_encode(window::hops(20, 400, 10, 20));")
+    assert hops > php("echo json_encode(window::WALK_MAX_DEPTH);")